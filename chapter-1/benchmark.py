@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import numpy as np
+from mcs.monte_carlo_twice import Search, main_twice
+from mcs.monte_carlo_split import main_split
+from mcs.monte_carlo_batch import STRATEGIES, simulate
+
+BENCH_DIR = './benchmarks'
+HISTORY_FILE = os.path.join(BENCH_DIR, 'history.jsonl')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+AREA_SIZES = (50, 100, 200, 400)     # Side of the square search area; 50 is the real map.
+BATCH_SIZES = (1000, 10000, 100000)  # Missions per call of the batched simulator.
+MIN_TIME = 0.2                       # Seconds each measurement should run for.
+REPEAT = 3
+THRESHOLD = 0.25                     # Relative slowdown flagged as a regression.
+
+
+def measure(func, min_time=MIN_TIME, repeat=REPEAT):
+    '''
+    Returns the best time per call in seconds, calling func often enough to run for min_time.
+    '''
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def synthetic_search(size):
+    '''
+    Returns a Search whose three areas are blank size x size arrays instead of the real map cut-outs.
+    '''
+    app = Search('Synthetic')
+    app.sa1 = np.zeros((size, size, 3), np.uint8)
+    app.sa2 = np.zeros((size, size, 3), np.uint8)
+    app.sa3 = np.zeros((size, size, 3), np.uint8)
+    app.sailor_final_location(num_search_areas=3)
+    app.calc_search_effectiveness()
+    return app
+
+
+def benchmarks(area_sizes=AREA_SIZES, batch_sizes=BATCH_SIZES):
+    '''
+    Yields (name, callable) pairs for every hot path.
+    '''
+    for size in area_sizes:
+        app = synthetic_search(size)
+        yield f'sailor_final_location[area={size}]', lambda app=app: app.sailor_final_location(3)
+        yield f'conduct_search[area={size}]', lambda app=app: app.conduct_search(1, app.sa1, app.sep1)
+
+    app = synthetic_search(50)
+
+    def revise():
+        app.p1, app.p2, app.p3 = 0.2, 0.5, 0.3
+        app.revise_target_probs()
+    yield 'revise_target_probs', revise
+
+    yield 'main_twice', lambda: main_twice(1)
+    yield 'main_split', lambda: main_split(1)
+
+    for strategy in STRATEGIES:
+        for missions in batch_sizes:
+            yield f'simulate[{strategy},missions={missions}]', lambda s=strategy, m=missions: simulate(s, m, rng=0)
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    area_sizes = AREA_SIZES[:2] if args.quick else AREA_SIZES
+    batch_sizes = BATCH_SIZES[:2] if args.quick else BATCH_SIZES
+    results = {}
+    for name, func in benchmarks(area_sizes, batch_sizes):
+        if args.only and args.only not in name:
+            continue
+        random.seed(0)
+        np.random.seed(0)
+        results[name] = measure(func, args.min_time)
+        print(f'{name:45} {results[name] * 1e3:12.4f} ms')
+    return results
+
+
+def compare(results, baseline, threshold):
+    '''
+    Prints the change against the baseline and returns the names of the regressed benchmarks.
+    '''
+    regressions = []
+    print(f'\n{"benchmark":45} {"baseline ms":>12} {"now ms":>12} {"change":>8}')
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        change = seconds / baseline[name] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f'{name:45} {baseline[name] * 1e3:12.4f} {seconds * 1e3:12.4f} {change:+8.1%}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times the search simulation hot paths.')
+    parser.add_argument('--quick', action='store_true', help='only the smaller area and batch sizes')
+    parser.add_argument('--only', help='run only benchmarks whose name contains this text')
+    parser.add_argument('--min-time', type=float, default=MIN_TIME)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args()
+
+    results = run(args)
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    record = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(HISTORY_FILE, 'a', encoding='utf-8') as outfile:
+        outfile.write(json.dumps(record) + '\n')
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, encoding='utf-8') as infile:
+                baseline = json.load(infile)
+        baseline.update(results)
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as outfile:
+            json.dump(baseline, outfile, indent=2, sort_keys=True)
+        print(f'\nBaseline saved to {BASELINE_FILE}')
+        return
+
+    if not os.path.exists(BASELINE_FILE):
+        print(f'\nNo baseline in {BASELINE_FILE}, run with --save-baseline to create one.')
+        return
+    with open(BASELINE_FILE, encoding='utf-8') as infile:
+        baseline = json.load(infile)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) above {args.threshold:.0%}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,35 @@
+import os
+import time
 import statistics
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from mcs import profiling
 from mcs.monte_carlo_twice import main_twice
 from mcs.monte_carlo_split import main_split
 
 ATTEMPT = 10000
-succes_twice = []
-succes_split = []
+CHUNKSIZE = 100
+WORKERS = os.cpu_count()
 
 
-with ThreadPoolExecutor() as pool:
-    results_twice = [x for x in pool.map(main_twice, range(1, ATTEMPT))]
-    results_split = [x for x in pool.map(main_split, range(1, ATTEMPT))]
+def main():
+    # Run with MCS_PROFILE=1 to print where the time goes in the workers and the pool.
+    with ProcessPoolExecutor(WORKERS) as pool:
+        start = time.perf_counter()
+        results_twice = profiling.collect(
+            pool.map(profiling.profiled(main_twice), range(1, ATTEMPT), chunksize=CHUNKSIZE))
+        results_split = profiling.collect(
+            pool.map(profiling.profiled(main_split), range(1, ATTEMPT), chunksize=CHUNKSIZE))
+        wall = time.perf_counter() - start
     print('Avg successful approach for "twice" mission:', round(statistics.mean(results_twice), 2))
-    print('Avg successful approach for "split" mission:', round(statistics.mean(results_split), 2))
\ No newline at end of file
+    print('Avg successful approach for "split" mission:', round(statistics.mean(results_split), 2))
+
+    if profiling.ENABLED:
+        stats = profiling.snapshot()
+        busy = stats.get('mission', [0.0])[0]
+        profiling.record('pool_overhead', max(wall * WORKERS - busy, 0.0), calls=0)
+        profiling.report()
+        print(f'\nWall time {wall:.2f} s on {WORKERS} workers, {busy / (wall * WORKERS):.0%} busy in missions')
+
+
+if __name__ == '__main__':
+    main()
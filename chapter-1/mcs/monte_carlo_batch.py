@@ -0,0 +1,177 @@
+import numpy as np
+try:
+    from mcs import profiling
+except ImportError:  # Run as a script: python mcs/<module>.py
+    import profiling
+
+AREA_SIZE = 50 * 50   # Number of cells in every 50 x 50 search area.
+NUM_SEARCH_AREAS = 3
+
+PRIORS = (0.2, 0.5, 0.3)
+SEP_RANGE = (0.2, 0.9)
+MAX_APPROACHES = 1000
+
+# Uniform numbers used by one approach: three search effectiveness values and two hit tests.
+DRAWS_PER_APPROACH = NUM_SEARCH_AREAS + 2
+# Approaches driven by the low-discrepancy sequence; almost every mission ends within them,
+# later approaches fall back to pseudo-random numbers.
+QMC_APPROACHES = 4
+REPLICATES = 16
+SEEDS = 10  # Repeated runs behind the sampler comparison in __main__
+
+# Area pairs for the "split" mission in the order of options 4, 5 and 6.
+PAIRS = np.array([[0, 1], [0, 2], [1, 2]])
+
+STRATEGIES = ('twice', 'split')
+
+
+def sailor_areas(u, num_search_areas=NUM_SEARCH_AREAS):
+    '''
+    Maps uniform numbers to 0-based areas like int(random.triangular(1, num_search_areas + 1)).
+    '''
+    low, high = 1, num_search_areas + 1
+    mode = (low + high) / 2
+    cut = (mode - low) / (high - low)
+    x = np.where(u < cut,
+                 low + np.sqrt(u * (high - low) * (mode - low)),
+                 high - np.sqrt((1 - u) * (high - low) * (high - mode)))
+    return np.minimum(x.astype(int), num_search_areas) - 1
+
+
+@profiling.timed('batch_simulate')
+def simulate(strategy, missions, priors=PRIORS, sep_range=SEP_RANGE, rng=None,
+             max_approaches=MAX_APPROACHES, scenarios=None):
+    '''
+    Plays many missions at once and returns the number of the successful approach for each one.
+
+    Follows the rules of main_twice and main_split, but instead of shuffling coordinate lists it draws
+    the hit test directly: a search covering k of the AREA_SIZE cells finds the sailor with probability
+    k / AREA_SIZE, and the cells covered twice by the "twice" mission are hypergeometric.
+    Missions still running after max_approaches are reported as max_approaches.
+
+    scenarios is an optional (missions, columns) array of uniform numbers, e.g. from sobol_scenarios().
+    Column 0 places the sailor and each approach takes the next DRAWS_PER_APPROACH columns;
+    draws past the last column come from rng.
+    '''
+    if strategy not in STRATEGIES:
+        raise ValueError(f'Unknown strategy {strategy!r}, expected one of {STRATEGIES}')
+    rng = np.random.default_rng(rng)
+    sep_low, sep_high = sep_range
+
+    active = np.arange(missions)
+
+    def uniforms(first, count):
+        if scenarios is not None and first + count <= scenarios.shape[1]:
+            return scenarios[active, first:first + count]
+        return rng.random((active.size, count))
+
+    area = sailor_areas(uniforms(0, 1)[:, 0])
+    probs = np.tile(np.asarray(priors, dtype=float), (missions, 1))
+    approaches = np.full(missions, max_approaches)
+
+    for search_num in range(1, max_approaches + 1):
+        n = active.size
+        if n == 0:
+            break
+        rows = np.arange(n)
+        p = probs[active]
+        draws = uniforms(1 + (search_num - 1) * DRAWS_PER_APPROACH, DRAWS_PER_APPROACH)
+
+        sep = sep_low + (sep_high - sep_low) * draws[:, :NUM_SEARCH_AREAS]
+        cover = np.floor(AREA_SIZE * sep) / AREA_SIZE
+        new_sep = np.zeros_like(sep)
+
+        if strategy == 'twice':
+            first = second = p.argmax(axis=1)
+            cells = np.floor(AREA_SIZE * sep[rows, first]).astype(np.int64)
+            overlap = rng.hypergeometric(cells, AREA_SIZE - cells, cells)
+            new_sep[rows, first] = (2 * cells - overlap) / AREA_SIZE
+        else:
+            choice = p[:, PAIRS].sum(axis=2).argmax(axis=1)
+            first, second = PAIRS[choice].T
+            new_sep[rows, first] = sep[rows, first]
+            new_sep[rows, second] = sep[rows, second]
+
+        u = draws[:, NUM_SEARCH_AREAS:]
+        hit = (((area[active] == first) & (u[:, 0] < cover[rows, first]))
+               | ((area[active] == second) & (u[:, 1] < cover[rows, second])))
+
+        # Uses Bayesian theory to update the probability.
+        p = p * (1 - new_sep)
+        probs[active] = p / p.sum(axis=1, keepdims=True)
+
+        approaches[active[hit]] = search_num
+        active = active[~hit]
+
+    return approaches
+
+
+def sobol_scenarios(missions, rng=None, approaches=QMC_APPROACHES):
+    '''
+    Returns a (missions, columns) array of scrambled Sobol points for simulate().
+    missions should be a power of two to keep the sequence balanced.
+    '''
+    from scipy.stats import qmc
+
+    sampler = qmc.Sobol(1 + approaches * DRAWS_PER_APPROACH, scramble=True, seed=rng)
+    return sampler.random(missions)
+
+
+def qmc_budget(missions, replicates=REPLICATES):
+    '''
+    Returns the number of missions closest to the given budget that 'qmc' can play:
+    replicates times a power of two.
+    '''
+    per_replicate = max(missions // replicates, 1)
+    return (1 << max(int(round(np.log2(per_replicate))), 0)) * replicates
+
+
+def estimate(strategy, missions, priors=PRIORS, sep_range=SEP_RANGE, rng=None,
+             sampler='mc', replicates=REPLICATES):
+    '''
+    Returns the mean successful approach, its standard error and the number of missions played.
+
+    The budget is split into independent replicates (independently scrambled for 'qmc') and the
+    standard error comes from the spread of replicate means. A 'qmc' budget must be replicates
+    times a power of two, see qmc_budget().
+    '''
+    rng = np.random.default_rng(rng)
+    per_replicate = max(missions // replicates, 1)
+    if sampler == 'qmc':
+        if missions != qmc_budget(missions, replicates):
+            raise ValueError(f"'qmc' plays replicates times a power of two missions, "
+                             f"use {qmc_budget(missions, replicates)} instead of {missions}")
+    elif sampler != 'mc':
+        raise ValueError(f"Unknown sampler {sampler!r}, expected 'mc' or 'qmc'")
+
+    means = []
+    for _ in range(replicates):
+        scenarios = sobol_scenarios(per_replicate, rng) if sampler == 'qmc' else None
+        means.append(simulate(strategy, per_replicate, priors, sep_range, rng, scenarios=scenarios).mean())
+    means = np.array(means)
+    stderr = means.std(ddof=1) / np.sqrt(replicates) if replicates > 1 else float('nan')
+    return float(means.mean()), float(stderr), per_replicate * replicates
+
+
+def expected_approaches(strategy, missions, priors=PRIORS, sep_range=SEP_RANGE, rng=None, sampler='mc'):
+    '''
+    Returns the average number of the successful approach over a batch of missions.
+    '''
+    if sampler == 'mc':
+        return float(simulate(strategy, missions, priors, sep_range, rng).mean())
+    return estimate(strategy, missions, priors, sep_range, rng, sampler)[0]
+
+
+if __name__ == '__main__':
+    for name in STRATEGIES:
+        print(f'Avg successful approach for "{name}" mission:', round(expected_approaches(name, 10000), 2))
+
+    # One run's standard error is itself noisy, so the variances are averaged over seeds.
+    print(f'\nStandard error of the average by sampler, over {SEEDS} seeds:')
+    for name in STRATEGIES:
+        for missions in (1024, 4096, 16384):
+            mc_var, qmc_var = (
+                np.mean([estimate(name, missions, rng=seed, sampler=sampler)[1] ** 2 for seed in range(SEEDS)])
+                for sampler in ('mc', 'qmc'))
+            print(f'{name:6} {missions:6d} missions: MC {np.sqrt(mc_var):.4f}  QMC {np.sqrt(qmc_var):.4f}'
+                  f'  ({mc_var / qmc_var:.1f}x fewer missions)')
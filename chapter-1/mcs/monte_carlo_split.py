@@ -3,6 +3,10 @@ import random
 import itertools as it
 import numpy as np
 import cv2 as cv
+try:
+    from mcs import profiling
+except ImportError:  # Run as a script: python mcs/<module>.py
+    import profiling
 
 MAP_FILE = './images/cape_python.png'
 
@@ -85,16 +89,28 @@ class Search:
         '''
         Returns the search result and the list of coordinates searched.
         '''
+        coords = self.sample_coverage(area_array, effectiveness_prob)
+        if self.is_hit(area_num, coords):
+            return f'Found in area {area_num}.', coords
+        else:
+            return 'Not found.', coords
+
+    def sample_coverage(self, area_array, effectiveness_prob):
+        '''
+        Returns a random list of local coordinates covering the given fraction of the area.
+        '''
         local_y_range = range(area_array.shape[0])
         local_x_range = range(area_array.shape[1])
         coords = list(it.product(local_x_range, local_y_range))
         random.shuffle(coords)
-        coords = coords[:int(len(coords) * effectiveness_prob)]
+        return coords[:int(len(coords) * effectiveness_prob)]
+
+    def is_hit(self, area_num, coords):
+        '''
+        Checks whether the searched coordinates contain the sailor.
+        '''
         loc_actual = (self.sailor_actual[0], self.sailor_actual[1])
-        if area_num == self.area_actual and loc_actual in coords:
-            return f'Found in area {area_num}.', coords
-        else:
-            return 'Not found.', coords
+        return area_num == self.area_actual and loc_actual in coords
 
     def revise_target_probs(self):
         '''
@@ -105,9 +121,20 @@ class Search:
         self.p2 = self.p2 * (1 - self.sep2) / denom
         self.p3 = self.p3 * (1 - self.sep3) / denom
 
+
+profiling.instrument(Search, {
+    '__init__': 'map_loading',
+    'sailor_final_location': 'sailor_location',
+    'calc_search_effectiveness': 'effectiveness',
+    'sample_coverage': 'coverage_sampling',
+    'is_hit': 'hit_testing',
+    'revise_target_probs': 'bayes_update',
+})
+
 # Monte Carlo for 1+2, 1+3, 2+3
 
 
+@profiling.timed('mission')
 def main_split(attempt):
     app = Search('Cape_Python')
     app.sailor_final_location(num_search_areas=3)
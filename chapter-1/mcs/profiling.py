@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import functools
+
+# Set MCS_PROFILE=1 before starting a run to collect per-phase statistics.
+# When it is not set the decorators below hand back the original functions untouched.
+ENABLED = os.environ.get('MCS_PROFILE', '') not in ('', '0')
+
+# phase -> [seconds, calls, net blocks]. Net blocks is the change of sys.getallocatedblocks()
+# over each call: the blocks a phase leaves allocated, not how many allocations it made.
+_stats = {}
+
+
+def record(phase, seconds, blocks=0, calls=1):
+    entry = _stats.setdefault(phase, [0.0, 0, 0])
+    entry[0] += seconds
+    entry[1] += calls
+    entry[2] += blocks
+
+
+def timed(phase):
+    '''
+    Decorator that adds the wall time, call count and net blocks of a function to a phase.
+    '''
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            blocks = sys.getallocatedblocks()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(phase, time.perf_counter() - start, sys.getallocatedblocks() - blocks)
+        return wrapper
+    return decorator
+
+
+def instrument(cls, phases):
+    '''
+    Wraps the methods of a class named in phases (method name -> phase name) with timed().
+    '''
+    if ENABLED:
+        for method, phase in phases.items():
+            setattr(cls, method, timed(phase)(getattr(cls, method)))
+    return cls
+
+
+def snapshot(reset=False):
+    '''
+    Returns a copy of the statistics collected in this process.
+    '''
+    stats = {phase: list(entry) for phase, entry in _stats.items()}
+    if reset:
+        _stats.clear()
+    return stats
+
+
+def merge(total, stats):
+    '''
+    Adds the statistics from another process into total and returns it.
+    '''
+    for phase, (seconds, calls, blocks) in stats.items():
+        entry = total.setdefault(phase, [0.0, 0, 0])
+        entry[0] += seconds
+        entry[1] += calls
+        entry[2] += blocks
+    return total
+
+
+def _call_and_snapshot(func, *args):
+    _stats.clear()
+    return func(*args), snapshot(reset=True)
+
+
+def profiled(func):
+    '''
+    Returns a picklable callable for pool workers that also returns the worker statistics of each call.
+    Returns func itself when profiling is disabled.
+    '''
+    if not ENABLED:
+        return func
+    return functools.partial(_call_and_snapshot, func)
+
+
+def collect(results):
+    '''
+    Splits the (result, stats) pairs returned by profiled() calls and merges their statistics
+    into this process. Passes plain results through when profiling is disabled.
+    '''
+    if not ENABLED:
+        return list(results)
+    values = []
+    for value, stats in results:
+        values.append(value)
+        merge(_stats, stats)
+    return values
+
+
+def report(stats=None, file=sys.stderr):
+    '''
+    Prints a breakdown of time, calls and net blocks per phase.
+    '''
+    stats = snapshot() if stats is None else stats
+    if not stats:
+        return
+    print(f'\n{"phase":24} {"calls":>10} {"total s":>10} {"per call us":>12} {"net blocks":>12}', file=file)
+    for phase, (seconds, calls, blocks) in sorted(stats.items(), key=lambda item: -item[1][0]):
+        per_call = seconds / calls * 1e6 if calls else 0
+        print(f'{phase:24} {calls:10d} {seconds:10.3f} {per_call:12.1f} {blocks:12d}', file=file)
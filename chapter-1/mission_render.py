@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import cv2 as cv
+from search_and_rescue import Search, SA1_CORNERS, SA2_CORNERS, SA3_CORNERS
+
+LAST_KNOWN = (160, 290)
+SA_CORNERS = (SA1_CORNERS, SA2_CORNERS, SA3_CORNERS)  # (UL-X, UL-Y, LR-X, LR-Y)
+
+COVERAGE_COLORS = ((0, 215, 255), (255, 160, 0))  # BGR for the first and second search of an approach
+COVERAGE_ALPHA = 0.55
+HEATMAP_ALPHA = 0.35
+HEATMAP_LUT = cv.applyColorMap(np.arange(256, dtype=np.uint8).reshape(-1, 1), cv.COLORMAP_JET)[:, 0]
+
+OUTPUT_DIR = './render'
+
+
+def plan_twice(probs):
+    '''
+    Searches the most probable area twice.
+    '''
+    area = probs.index(max(probs)) + 1
+    return area, area
+
+
+def plan_split(probs):
+    '''
+    Searches the most probable pair of areas once each.
+    '''
+    pairs = ((1, 2), (1, 3), (2, 3))
+    to_choice = [probs[a - 1] + probs[b - 1] for a, b in pairs]
+    return pairs[to_choice.index(max(to_choice))]
+
+
+STRATEGIES = {'twice': plan_twice, 'split': plan_split}
+
+
+def record_mission(strategy, max_approaches=100, stop_when_found=True):
+    '''
+    Plays a mission with the MCS decision rule and returns the sailor location and the approach history.
+    '''
+    app = Search('Cape_Python')
+    sailor = app.sailor_final_location(num_search_areas=3)
+    areas = (app.sa1, app.sa2, app.sa3)
+    approaches = []
+
+    for search_num in range(1, max_approaches + 1):
+        app.calc_search_effectiveness()
+        seps = [app.sep1, app.sep2, app.sep3]
+        plan = STRATEGIES[strategy]([app.p1, app.p2, app.p3])
+
+        searches = []
+        found = False
+        for area_num in plan:
+            result, coords = app.conduct_search(area_num, areas[area_num - 1], seps[area_num - 1])
+            searches.append((area_num, coords))
+            found = found or result != 'Not found.'
+
+        # Same effectiveness bookkeeping as the MCS missions.
+        if plan[0] == plan[1]:
+            area_num = plan[0]
+            union = set(searches[0][1] + searches[1][1])
+            seps = [0, 0, 0]
+            seps[area_num - 1] = len(union) / len(areas[area_num - 1]) ** 2
+        else:
+            seps = [sep if num in plan else 0 for num, sep in enumerate(seps, start=1)]
+        app.sep1, app.sep2, app.sep3 = seps
+
+        # Uses Bayesian theory to update the probability.
+        app.revise_target_probs()
+
+        approaches.append({
+            'search_num': search_num,
+            'searches': searches,
+            'probs': (app.p1, app.p2, app.p3),
+            'found': found,
+        })
+        if found and stop_when_found:
+            break
+
+    return sailor, approaches
+
+
+class MissionRenderer:
+    '''
+    Composites mission frames offscreen on top of a static map layer drawn once.
+    '''
+
+    def __init__(self, last_known=LAST_KNOWN):
+        app = Search('Cape_Python')
+        app.draw_layout(last_known)
+        self.base = app.img
+
+        # Only the region around the search areas changes between frames.
+        self.x0 = min(c[0] for c in SA_CORNERS)
+        self.y0 = min(c[1] for c in SA_CORNERS)
+        self.x1 = max(c[2] for c in SA_CORNERS)
+        self.y1 = max(c[3] for c in SA_CORNERS)
+        self.roi_base = self.base[self.y0:self.y1, self.x0:self.x1].astype(np.float32)
+
+    def _area_slice(self, area_num):
+        ul_x, ul_y, lr_x, lr_y = SA_CORNERS[area_num - 1]
+        return (slice(ul_y - self.y0, lr_y - self.y0), slice(ul_x - self.x0, lr_x - self.x0))
+
+    def render(self, sailor, approach):
+        '''
+        Returns a BGR frame with the posterior heatmap, coverage masks and sailor marker for one approach.
+        '''
+        color = np.zeros_like(self.roi_base)
+        alpha = np.zeros(self.roi_base.shape[:2] + (1,), np.float32)
+
+        # Posterior heatmap, one flat colour per search area.
+        for area_num, prob in enumerate(approach['probs'], start=1):
+            rows, cols = self._area_slice(area_num)
+            color[rows, cols] = HEATMAP_LUT[int(round(prob * 255))]
+            alpha[rows, cols] = HEATMAP_ALPHA
+
+        # Coverage masks of the searched local coordinates.
+        for (area_num, coords), search_color in zip(approach['searches'], COVERAGE_COLORS):
+            if not coords:
+                continue
+            rows, cols = self._area_slice(area_num)
+            xs, ys = np.array(coords, dtype=np.intp).T
+            area_color = color[rows, cols]
+            area_alpha = alpha[rows, cols]
+            area_color[ys, xs] = search_color
+            area_alpha[ys, xs] = COVERAGE_ALPHA
+
+        frame = self.base.copy()
+        roi = self.roi_base + alpha * (color - self.roi_base)
+        frame[self.y0:self.y1, self.x0:self.x1] = roi.astype(np.uint8)
+
+        cv.circle(frame, (int(sailor[0]), int(sailor[1])), 3, (255, 0, 0), -1)
+        probs = 'P = ' + ' / '.join(f'{prob:.3f}' for prob in approach['probs'])
+        status = 'found' if approach['found'] else 'not found'
+        cv.putText(frame, f"Approach No. {approach['search_num']} - {status}", (240, 317),
+                   cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
+        cv.putText(frame, probs, (240, 335), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
+        return frame
+
+    def frames(self, sailor, approaches):
+        '''
+        Yields one rendered frame per approach.
+        '''
+        for approach in approaches:
+            yield self.render(sailor, approach)
+
+
+def write_png_sequence(frames, out_dir=OUTPUT_DIR):
+    '''
+    Writes frames as numbered PNG files and returns the number written.
+    '''
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for count, frame in enumerate(frames, start=1):
+        cv.imwrite(os.path.join(out_dir, f'approach_{count:03d}.png'), frame)
+    return count
+
+
+def write_video(frames, path, fps=4):
+    '''
+    Writes frames to a video file and returns the number written.
+    '''
+    writer = None
+    count = 0
+    try:
+        for count, frame in enumerate(frames, start=1):
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = cv.VideoWriter(path, cv.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+                if not writer.isOpened():
+                    print(f'Unable to open video file {path}', file=sys.stderr)
+                    sys.exit(1)
+            writer.write(frame)
+    finally:
+        if writer is not None:
+            writer.release()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Renders a search and rescue mission without a display.')
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='twice')
+    parser.add_argument('--approaches', type=int, default=100, help='maximum number of approaches')
+    parser.add_argument('--keep-searching', action='store_true',
+                        help='keep searching after the sailor is found')
+    parser.add_argument('--out', default=OUTPUT_DIR, help='directory for the PNG sequence')
+    parser.add_argument('--video', help='write a video file (e.g. mission.mp4) instead of PNG files')
+    parser.add_argument('--fps', type=int, default=4)
+    args = parser.parse_args()
+
+    sailor, approaches = record_mission(args.strategy, args.approaches, not args.keep_searching)
+
+    start = time.perf_counter()
+    renderer = MissionRenderer()
+    frames = renderer.frames(sailor, approaches)
+    if args.video:
+        count = write_video(frames, args.video, args.fps)
+        target = args.video
+    else:
+        count = write_png_sequence(frames, args.out)
+        target = args.out
+    elapsed = time.perf_counter() - start
+    print(f'Rendered {count} approaches to {target} in {elapsed:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
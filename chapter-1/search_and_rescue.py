@@ -51,6 +51,15 @@ class Search:
         '''
         Displays a map of the region with scale, last known location and search areas.
         '''
+        self.draw_layout(last_known)
+        cv.imshow('Areas to be searched', self.img)
+        cv.moveWindow('Areas to be searched', 750, 10)
+        cv.waitKey(500)
+
+    def draw_layout(self, last_known):
+        '''
+        Draws the scale, last known location and search areas onto the map without displaying it.
+        '''
         # Draws a scale bar.
         cv.line(self.img, (20, 370), (70, 370), (0, 0, 0), 2)
         cv.putText(self.img, '0', (8, 370), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
@@ -69,10 +78,6 @@ class Search:
         cv.putText(self.img, '+ = last known location', (240, 355), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
         cv.putText(self.img, '* = actual location', (242, 370), cv.FONT_HERSHEY_PLAIN, 1, (255, 0, 0))
 
-        cv.imshow('Areas to be searched', self.img)
-        cv.moveWindow('Areas to be searched', 750, 10)
-        cv.waitKey(500)
-
     def sailor_final_location(self, num_search_areas):
         '''
         Returns the x and y coordinates of the real location of a missing person.
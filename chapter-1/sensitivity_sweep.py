@@ -0,0 +1,175 @@
+import os
+import csv
+import json
+import hashlib
+import argparse
+import itertools as it
+import numpy as np
+import cv2 as cv
+from mcs.monte_carlo_batch import STRATEGIES, expected_approaches, qmc_budget
+
+CACHE_DIR = './.sweep_cache'
+CACHE_VERSION = 2   # Bump when the simulator changes so old grid points are recomputed.
+HEATMAP_FILE = './sweep_heatmap.png'
+
+CELL_W, CELL_H = 70, 26
+LABEL_W, HEADER_H = 130, 44
+
+
+def frange(start, stop, num):
+    '''
+    Returns num evenly spaced values rounded to 4 decimals, like np.linspace.
+    '''
+    return [round(float(x), 4) for x in np.linspace(start, stop, int(num))]
+
+
+def point_key(params):
+    '''
+    Returns a stable hash of the parameters of one grid point.
+    '''
+    text = json.dumps(dict(params, version=CACHE_VERSION), sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def evaluate_point(params, cache_dir=CACHE_DIR):
+    '''
+    Returns the expected approaches of every strategy for one grid point, using the cache if possible.
+    '''
+    key = point_key(params)
+    path = os.path.join(cache_dir, f'{key}.json')
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as infile:
+            return json.load(infile)['results'], True
+
+    # Seeding from the key makes a point independent of the grid it was computed in.
+    seed = int(key[:16], 16)
+    priors = (params['p1'], params['p2'], params['p3'])
+    sep_range = (params['sep_low'], params['sep_high'])
+    sampler = params.get('sampler', 'mc')
+    results = {name: expected_approaches(name, params['missions'], priors, sep_range, seed, sampler)
+               for name in STRATEGIES}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as outfile:
+        json.dump({'params': params, 'results': results}, outfile)
+    return results, False
+
+
+def build_grid(args):
+    '''
+    Returns the list of parameter dicts for every valid combination of the swept ranges.
+    '''
+    grid = []
+    for p1, p2, sep_low, sep_high in it.product(frange(*args.p1), frange(*args.p2),
+                                                 frange(*args.sep_low), frange(*args.sep_high)):
+        p3 = round(1 - p1 - p2, 4)
+        if p3 <= 0 or sep_low >= sep_high:
+            continue
+        params = {'p1': p1, 'p2': p2, 'p3': p3, 'sep_low': sep_low, 'sep_high': sep_high,
+                  'missions': args.missions}
+        if args.sampler != 'mc':
+            params['sampler'] = args.sampler
+        grid.append(params)
+    return grid
+
+
+def print_table(rows):
+    header = f"{'P1':>6} {'P2':>6} {'P3':>6} {'E low':>6} {'E high':>6}"
+    header += ''.join(f' {name:>8}' for name in STRATEGIES) + '  best'
+    print(header)
+    print('-' * len(header))
+    for params, results in rows:
+        line = (f"{params['p1']:6.3f} {params['p2']:6.3f} {params['p3']:6.3f} "
+                f"{params['sep_low']:6.3f} {params['sep_high']:6.3f}")
+        line += ''.join(f' {results[name]:8.3f}' for name in STRATEGIES)
+        print(line + '  ' + min(results, key=results.get))
+
+
+def write_csv(rows, filename):
+    with open(filename, 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['p1', 'p2', 'p3', 'sep_low', 'sep_high'] + list(STRATEGIES) + ['best'])
+        for params, results in rows:
+            writer.writerow([params['p1'], params['p2'], params['p3'], params['sep_low'], params['sep_high']]
+                            + [results[name] for name in STRATEGIES] + [min(results, key=results.get)])
+
+
+def draw_heatmap(rows, filename=HEATMAP_FILE):
+    '''
+    Saves a heatmap of expected approaches with priors as rows and effectiveness bounds as columns,
+    one panel per strategy.
+    '''
+    prior_keys = sorted({(p['p1'], p['p2'], p['p3']) for p, _ in rows})
+    sep_keys = sorted({(p['sep_low'], p['sep_high']) for p, _ in rows})
+    values = np.full((len(STRATEGIES), len(prior_keys), len(sep_keys)), np.nan)
+    for params, results in rows:
+        r = prior_keys.index((params['p1'], params['p2'], params['p3']))
+        c = sep_keys.index((params['sep_low'], params['sep_high']))
+        values[:, r, c] = [results[name] for name in STRATEGIES]
+
+    low, high = np.nanmin(values), np.nanmax(values)
+    scaled = np.nan_to_num((values - low) / max(high - low, 1e-9) * 255).astype(np.uint8)
+    colors = cv.applyColorMap(scaled.reshape(-1, 1), cv.COLORMAP_VIRIDIS).reshape(values.shape + (3,))
+
+    panel_w = LABEL_W + CELL_W * len(sep_keys)
+    height = HEADER_H + CELL_H * len(prior_keys)
+    img = np.full((height, panel_w * len(STRATEGIES), 3), 255, np.uint8)
+    font = cv.FONT_HERSHEY_PLAIN
+    for s, name in enumerate(STRATEGIES):
+        x0 = s * panel_w
+        cv.putText(img, f'"{name}" mission', (x0 + 5, 16), font, 1, (0, 0, 0))
+        cv.putText(img, 'P1/P2/P3 vs E', (x0 + 5, 38), font, 0.8, (0, 0, 0))
+        for c, (sep_low, sep_high) in enumerate(sep_keys):
+            cv.putText(img, f'{sep_low:.2f}-{sep_high:.2f}', (x0 + LABEL_W + c * CELL_W + 2, 38),
+                       font, 0.8, (0, 0, 0))
+        for r, prior in enumerate(prior_keys):
+            y = HEADER_H + r * CELL_H
+            cv.putText(img, '/'.join(f'{p:.2f}' for p in prior), (x0 + 5, y + 18), font, 0.8, (0, 0, 0))
+            for c in range(len(sep_keys)):
+                if np.isnan(values[s, r, c]):
+                    continue
+                x = x0 + LABEL_W + c * CELL_W
+                img[y:y + CELL_H - 1, x:x + CELL_W - 1] = colors[s, r, c]
+                text_color = (0, 0, 0) if scaled[s, r, c] > 128 else (255, 255, 255)
+                cv.putText(img, f'{values[s, r, c]:.2f}', (x + 12, y + 18), font, 1, text_color)
+    cv.imwrite(filename, img)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweeps priors and search effectiveness bounds '
+                                                 'and compares the expected approaches of each strategy.')
+    parser.add_argument('--p1', nargs=3, type=float, default=(0.2, 0.2, 1), metavar=('START', 'STOP', 'NUM'))
+    parser.add_argument('--p2', nargs=3, type=float, default=(0.5, 0.5, 1), metavar=('START', 'STOP', 'NUM'))
+    parser.add_argument('--sep-low', nargs=3, type=float, default=(0.2, 0.2, 1), metavar=('START', 'STOP', 'NUM'))
+    parser.add_argument('--sep-high', nargs=3, type=float, default=(0.9, 0.9, 1), metavar=('START', 'STOP', 'NUM'))
+    parser.add_argument('--missions', type=int, default=10000, help='missions per strategy and grid point')
+    parser.add_argument('--sampler', choices=('mc', 'qmc'), default='mc',
+                        help='pseudo-random or scrambled Sobol scenarios')
+    parser.add_argument('--cache', default=CACHE_DIR)
+    parser.add_argument('--csv', help='also save the table to a CSV file')
+    parser.add_argument('--heatmap', default=HEATMAP_FILE)
+    args = parser.parse_args()
+
+    if args.sampler == 'qmc' and qmc_budget(args.missions) != args.missions:
+        # Cache and label the grid points with the number of missions actually played.
+        print(f'qmc plays {qmc_budget(args.missions)} missions instead of {args.missions}')
+        args.missions = qmc_budget(args.missions)
+    grid = build_grid(args)
+    rows = []
+    cached = 0
+    for params in grid:
+        results, hit = evaluate_point(params, args.cache)
+        cached += hit
+        rows.append((params, results))
+    print(f'{len(grid)} grid points, {cached} from cache, {len(grid) - cached} computed\n')
+
+    print_table(rows)
+    if args.csv:
+        write_csv(rows, args.csv)
+    if rows:
+        draw_heatmap(rows, args.heatmap)
+        print(f'\nHeatmap saved to {args.heatmap}')
+
+
+if __name__ == '__main__':
+    main()
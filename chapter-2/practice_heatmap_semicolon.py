@@ -1,12 +1,21 @@
-import math
-from string import punctuation
-
 import matplotlib.pyplot as plt
-import nltk
 import numpy as np
 import seaborn as sns
 from matplotlib.colors import ListedColormap
 
+from stylo.binning import bin_values
+from stylo.punctuation import (
+    CODES,
+    PADDING,
+    encode_punctuation,
+    plot_class_maps,
+    square_grid,
+)
+
+BINNED = False  # True draws semicolon density in SIDE x SIDE buckets
+SIDE = 50
+ALL_CLASSES = True  # Also draws a map of every punctuation mark for each author
+
 
 def main():
     strings_by_author = dict()
@@ -17,13 +26,25 @@ def main():
     plt.ion()
     for author in punct_by_author:
         heat = convert_punct_to_number(punct_by_author, author)
-        arr = np.array((heat[:6561]))
-        arr_reshaped = arr.reshape(int(math.sqrt(len(arr))), int(math.sqrt(len(arr))))
         fig, ax = plt.subplots(figsize=(7, 7))
-        sns.heatmap(
-            arr_reshaped, cmap=ListedColormap(["blue", "yellow"]), square=True, ax=ax
-        )
+        if BINNED:
+            semicolon_density(heat, ax)
+        else:
+            # The whole text, padded to a square; padding cells stay blank.
+            grid = square_grid(heat)
+            sns.heatmap(
+                grid,
+                mask=grid == PADDING,
+                cmap=ListedColormap(["blue", "yellow"]),
+                square=True,
+                ax=ax,
+            )
         ax.set_title(f"Semicolon map for key {author.capitalize()}")
+        if ALL_CLASSES:
+            plot_class_maps(
+                punct_by_author[author],
+                f"Punctuation maps for key {author.capitalize()}",
+            )
     plt.show(block=True)
 
 
@@ -35,8 +56,7 @@ def text_to_string(filename):
 def make_punct_dict(strings_by_author):
     punct_by_author = dict()
     for author in strings_by_author:
-        tokens = nltk.word_tokenize(strings_by_author[author])
-        punct_by_author[author] = [ch for ch in tokens if ch in punctuation]
+        punct_by_author[author] = encode_punctuation(strings_by_author[author])
         print(
             f"Number of punctuation marks for the key {author} = {len(punct_by_author[author])}"
         )
@@ -44,14 +64,18 @@ def make_punct_dict(strings_by_author):
 
 
 def convert_punct_to_number(punct_by_author, author):
-    heat = []
-    for ch in punct_by_author[author]:
-        if ch == ";":
-            val = 1
-        else:
-            val = 2
-        heat.append(val)
-    return heat
+    codes = punct_by_author[author]
+    return np.where(codes == CODES[";"], 1, 2).astype(np.uint8)
+
+
+def semicolon_density(heat, ax, side=SIDE):
+    """
+    Draws the share of semicolons among the punctuation marks of every one of
+    side x side equal stretches of the text, covering the whole text.
+    """
+    is_semicolon = np.asarray(heat) == 1
+    density = bin_values(is_semicolon, side * side).reshape(side, side)
+    sns.heatmap(density, cmap="viridis", square=True, ax=ax)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
-import nltk
+from stylo.binning import BINS
+from stylo.positional import PositionalIndex, dispersion_plot
 
 target_words = [
     "Holmes",
@@ -10,6 +11,7 @@ target_words = [
     "Selden",
     "hound",
 ]
+BINNED = False  # True draws density strips of BINS buckets instead of one mark per word
 
 
 def main():
@@ -23,9 +25,9 @@ def text_to_string(filename):
 
 
 def analyse_text(text_to_analyse):
-    tokens = nltk.word_tokenize(text_to_analyse)
-    tokens = nltk.Text(tokens)
-    dispersion = tokens.dispersion_plot(target_words)
+    # Offsets come from the positional index instead of a scan of the whole text.
+    index = PositionalIndex.from_text(text_to_analyse)
+    dispersion = dispersion_plot(index, target_words, bins=BINS if BINNED else None)
     return dispersion
 
 
@@ -0,0 +1,27 @@
+"""
+Fixed-size positional binning for plots of long texts.
+
+Occurrences are histogrammed into a constant number of buckets along the text
+with np.bincount, so a plot drawn from the bins costs the same for a short
+story and a multi-volume work.
+"""
+
+import numpy as np
+
+BINS = 500  # Positional buckets per strip
+
+
+def bin_positions(positions, length, bins=BINS):
+    """Returns how many positions fall into each of `bins` equal slices of [0, length)."""
+    positions = np.asarray(positions, dtype=np.int64)
+    buckets = positions * bins // max(length, 1)
+    return np.bincount(buckets, minlength=bins)[:bins]
+
+
+def bin_values(values, bins=BINS):
+    """Returns the mean of a sequence of values in each of `bins` equal slices (NaN if empty)."""
+    values = np.asarray(values, dtype=float)
+    buckets = np.arange(values.size) * bins // max(values.size, 1)
+    sums = np.bincount(buckets, weights=values, minlength=bins)
+    counts = np.bincount(buckets, minlength=bins)
+    return np.divide(sums, counts, out=np.full(bins, np.nan), where=counts > 0)
@@ -0,0 +1,104 @@
+"""
+Bootstrap confidence intervals for the chi-square and Jaccard tests.
+
+Equal-length samples are drawn with replacement from the integer-encoded
+corpora. A batch of resamples is counted with one np.bincount over offset word
+ids, and both statistics are computed for the whole batch at once.
+"""
+
+import numpy as np
+
+from stylo import stats
+
+RESAMPLES = 1000
+BATCH_SIZE = 50  # Resamples counted at a time, bounds the temporary arrays
+CONFIDENCE = 0.95
+
+
+def resample_counts(ids, vocab_size, sample_size, count, rng):
+    """Returns a (count x vocab_size) array of word counts of random samples of a text."""
+    picks = np.asarray(ids)[rng.integers(0, len(ids), size=(count, sample_size))]
+    offsets = np.arange(count, dtype=np.int64)[:, np.newaxis] * vocab_size
+    counts = np.bincount((offsets + picks).ravel(), minlength=count * vocab_size)
+    return counts.reshape(count, vocab_size)
+
+
+def chi_square(
+    author_counts, unknown_counts, proportion, num_words=stats.CHI_SQUARE_WORDS
+):
+    """Returns the chi-square of every pair of rows over their num_words most common words."""
+    combined = author_counts + unknown_counts
+    num_words = min(num_words, combined.shape[1])
+    top = np.argpartition(-combined, num_words - 1, axis=1)[:, :num_words]
+    combined = np.take_along_axis(combined, top, axis=1)
+    observed = np.take_along_axis(author_counts, top, axis=1)
+    return stats.chi_square(observed, combined, proportion)
+
+
+def jaccard(author_counts, unknown_counts):
+    """Returns the Jaccard index of the vocabularies of every pair of rows."""
+    author_words = author_counts > 0
+    unknown_words = unknown_counts > 0
+    shared = np.count_nonzero(author_words & unknown_words, axis=1)
+    union = (
+        np.count_nonzero(author_words, axis=1)
+        + np.count_nonzero(unknown_words, axis=1)
+        - shared
+    )
+    return shared / np.maximum(union, 1)
+
+
+def bootstrap(
+    corpus,
+    sample_size,
+    unknown="unknown",
+    resamples=RESAMPLES,
+    batch_size=BATCH_SIZE,
+    seed=None,
+):
+    """
+    Returns the known authors and a dictionary of (resamples x authors) score arrays.
+    corpus is an EncodedCorpus; every row compares samples of sample_size words, and
+    all authors in a row are compared with the same sample of the unknown text.
+    """
+    rng = np.random.default_rng(seed)
+    authors = [author for author in corpus if author != unknown]
+    vocab_size = len(corpus.vocabulary)
+    scores = {
+        "chi_square": np.empty((resamples, len(authors))),
+        "jaccard": np.empty((resamples, len(authors))),
+    }
+    for start in range(0, resamples, batch_size):
+        rows = slice(start, min(start + batch_size, resamples))
+        count = rows.stop - rows.start
+        unknown_counts = resample_counts(
+            corpus[unknown], vocab_size, sample_size, count, rng
+        )
+        for column, author in enumerate(authors):
+            author_counts = resample_counts(
+                corpus[author], vocab_size, sample_size, count, rng
+            )
+            # Equal sample sizes, so each side expects half of the combined counts.
+            scores["chi_square"][rows, column] = chi_square(
+                author_counts, unknown_counts, 0.5
+            )
+            scores["jaccard"][rows, column] = jaccard(author_counts, unknown_counts)
+    return authors, scores
+
+
+def summarize(authors, scores, confidence=CONFIDENCE):
+    """
+    Returns {test: {author: (mean, low, high, win rate)}}, where [low, high] is the
+    percentile interval and the win rate the share of resamples the author scored best.
+    """
+    tail = (1 - confidence) / 2 * 100
+    summary = dict()
+    for test, values in scores.items():
+        best = values.argmin(axis=1) if test == "chi_square" else values.argmax(axis=1)
+        wins = np.bincount(best, minlength=len(authors)) / len(values)
+        low, high = np.percentile(values, [tail, 100 - tail], axis=0)
+        summary[test] = {
+            author: (float(values[:, i].mean()), low[i], high[i], wins[i])
+            for i, author in enumerate(authors)
+        }
+    return summary
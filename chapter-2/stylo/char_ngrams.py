@@ -0,0 +1,198 @@
+"""
+Hashed character n-gram feature vectors.
+
+Character n-grams of a lowercased, whitespace-collapsed text are hashed
+straight into a fixed number of buckets, so no n-gram vocabulary is kept and
+every vector has the same length. Hashes are computed for a whole chunk of
+code points at once with NumPy and counted with np.bincount; files are read
+chunk by chunk, so memory is bounded by the chunk size and the bucket count.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from stylo import stats
+from stylo.streaming import CHUNK_SIZE, iter_chunks
+
+NGRAM = 3
+NUM_FEATURES = 1 << 14  # Hash buckets, a power of two
+PRIME = np.uint64(0x100000001B3)  # FNV-1a 64-bit prime, the rolling multiplier
+MIX = np.uint64(0x9E3779B97F4A7C15)  # Fibonacci hashing multiplier
+SPACE = ord(" ")
+WHITESPACE = np.array([ord(char) for char in "\t\n\v\f\r \x85\xa0\u2028\u2029"])
+
+
+def code_points(text):
+    """
+    Returns the lowercased text as uint64 code points with every run of
+    whitespace replaced by one space.
+    """
+    points = np.frombuffer(text.lower().encode("utf-32-le"), dtype=np.uint32)
+    points = np.where(np.isin(points, WHITESPACE), SPACE, points).astype(np.uint64)
+    space = points == SPACE
+    repeated = np.zeros_like(space)
+    repeated[1:] = space[1:] & space[:-1]
+    return points[~repeated]
+
+
+class NgramHasher:
+    """Counts the character n-grams of texts into num_features hash buckets."""
+
+    def __init__(self, n=NGRAM, num_features=NUM_FEATURES):
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        if num_features < 2 or num_features & (num_features - 1):
+            raise ValueError("num_features must be a power of two")
+        self.n = n
+        self.num_features = num_features
+        self.shift = np.uint64(64 - (num_features.bit_length() - 1))
+
+    def buckets(self, points):
+        """Returns the bucket of every n-gram of a code point array."""
+        count = len(points) - self.n + 1
+        if count <= 0:
+            return np.zeros(0, dtype=np.intp)
+        # Polynomial hash of every window, wrapping around modulo 2**64.
+        hashes = points[:count].copy()
+        for k in range(1, self.n):
+            hashes *= PRIME
+            hashes += points[k : k + count]
+        hashes ^= hashes >> np.uint64(29)
+        hashes *= MIX
+        return (hashes >> self.shift).astype(np.intp)
+
+    def update(self, counts, chunk, carry=None):
+        """
+        Adds the n-grams of a chunk to counts and returns the carry for the next chunk:
+        its last n - 1 code points (at least one, to merge whitespace across the
+        boundary), so n-grams across the boundary are counted once.
+        """
+        points = code_points(chunk)
+        if carry is not None and len(carry):
+            if carry[-1] == SPACE and len(points) and points[0] == SPACE:
+                points = points[1:]
+            if not len(points):
+                return carry
+            if self.n > 1:
+                points = np.concatenate([carry, points])
+        counts += np.bincount(self.buckets(points), minlength=self.num_features)
+        return points[max(len(points) - max(self.n - 1, 1), 0) :]
+
+    def vector(self, text):
+        """Returns the int64 n-gram counts of a text."""
+        return self.vector_from_chunks([text])
+
+    def vector_from_chunks(self, chunks):
+        """Returns the n-gram counts of a text given as consecutive pieces."""
+        counts = np.zeros(self.num_features, dtype=np.int64)
+        carry = None
+        for chunk in chunks:
+            carry = self.update(counts, chunk, carry)
+        return counts
+
+    def vector_from_files(self, filenames, chunk_size=CHUNK_SIZE):
+        """Returns the n-gram counts of several text files read as one work."""
+        counts = np.zeros(self.num_features, dtype=np.int64)
+        for filename in filenames:
+            carry = None
+            for chunk in iter_chunks(filename, chunk_size):
+                carry = self.update(counts, chunk, carry)
+        return counts
+
+
+def check_streaming(hasher, filename, chunk_sizes=(CHUNK_SIZE, 1 << 12)):
+    """
+    Raises ValueError unless the counts of a file read in chunks of every size
+    equal the counts of the whole text.
+    """
+    with open(filename, encoding="utf-8") as infile:
+        expected = hasher.vector(infile.read())
+    for chunk_size in chunk_sizes:
+        counts = hasher.vector_from_files([filename], chunk_size)
+        if not np.array_equal(counts, expected):
+            raise ValueError(
+                f"{filename}: chunks of {chunk_size} characters miss "
+                f"{int(np.abs(counts - expected).sum())} n-gram counts"
+            )
+
+
+def relative_frequencies(counts):
+    """Returns n-gram counts (one vector or one row per text) scaled to sum to 1."""
+    counts = np.atleast_2d(counts).astype(float)
+    return counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)
+
+
+def chi_square(author_counts, unknown_counts):
+    """Returns the chi-square of every author row against the unknown text's counts."""
+    author_counts = np.atleast_2d(author_counts).astype(float)
+    combined = author_counts + unknown_counts
+    author_totals = author_counts.sum(axis=1, keepdims=True)
+    proportion = author_totals / np.maximum(author_totals + unknown_counts.sum(), 1)
+    return stats.chi_square(author_counts, combined, proportion)
+
+
+def distance(author_counts, unknown_counts):
+    """Returns the sum of absolute differences of relative n-gram frequencies."""
+    return np.abs(
+        relative_frequencies(author_counts) - relative_frequencies(unknown_counts)
+    ).sum(axis=1)
+
+
+def main():
+    # The registry builds on this module, so it is imported only by the command.
+    from stylo.registry import iter_corpus_dir
+
+    parser = argparse.ArgumentParser(
+        description="Scores an unknown text by hashed character n-grams."
+    )
+    parser.add_argument(
+        "corpus_dir", help="<author>.txt files or <author>/ directories"
+    )
+    parser.add_argument("unknown", help="text file of disputed authorship")
+    parser.add_argument("-n", type=int, default=NGRAM, help="n-gram length")
+    parser.add_argument("--features", type=int, default=NUM_FEATURES)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="verify that chunked and whole-text counts are equal",
+    )
+    args = parser.parse_args()
+
+    hasher = NgramHasher(args.n, args.features)
+    if args.check:
+        filenames = [args.unknown]
+        for _, author_files in iter_corpus_dir(args.corpus_dir):
+            filenames.extend(author_files)
+        for filename in filenames:
+            check_streaming(hasher, filename)
+        print(f"Chunked and whole-text counts agree for {len(filenames)} files")
+    start = time.perf_counter()
+    authors, rows = [], []
+    num_bytes = os.path.getsize(args.unknown)
+    for author, filenames in iter_corpus_dir(args.corpus_dir):
+        authors.append(author)
+        rows.append(hasher.vector_from_files(filenames))
+        num_bytes += sum(os.path.getsize(filename) for filename in filenames)
+    unknown = hasher.vector_from_files([args.unknown])
+    elapsed = time.perf_counter() - start
+    print(
+        f"Hashed {num_bytes / 1e6:.1f} MB of {len(authors)} authors in {elapsed:.2f} s "
+        f"({num_bytes / 1e6 / max(elapsed, 1e-9):.1f} MB/s)"
+    )
+
+    matrix = np.vstack(rows)
+    for test, scores in [
+        ("chi_square", chi_square(matrix, unknown)),
+        ("distance", distance(matrix, unknown)),
+    ]:
+        print(f"\nMost likely authors by {test}:")
+        for i in np.argsort(scores)[: args.top]:
+            print(f"    {authors[i]:30} {scores[i]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
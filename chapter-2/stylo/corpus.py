@@ -0,0 +1,93 @@
+"""
+Integer-encoded corpora over a shared vocabulary.
+
+Every word is stored once in the vocabulary and every text as a contiguous
+uint32 array of word ids, so slicing a text is a view and counting words is a
+single np.bincount.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class Vocabulary:
+    """Word <-> id mapping shared by all texts of a corpus."""
+
+    def __init__(self, words=()):
+        self.words = []
+        self.index = dict()
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        """Returns the id of a word, adding it to the vocabulary if it is new."""
+        word_id = self.index.get(word)
+        if word_id is None:
+            word_id = self.index[word] = len(self.words)
+            self.words.append(word)
+        return word_id
+
+    def encode(self, words):
+        """Returns the uint32 ids of a sequence of words, adding new words."""
+        return np.fromiter(
+            (self.add(word) for word in words), dtype=np.uint32, count=len(words)
+        )
+
+    def decode(self, ids):
+        """Returns the words of an id array."""
+        return [self.words[i] for i in np.asarray(ids).tolist()]
+
+    def mask(self, words):
+        """Returns a boolean array over the vocabulary that is True for the given words."""
+        mask = np.zeros(len(self.words), dtype=bool)
+        mask[[self.index[word] for word in words if word in self.index]] = True
+        return mask
+
+    def lengths(self):
+        """Returns the length of every word in the vocabulary."""
+        return np.fromiter(
+            (len(word) for word in self.words), dtype=np.intp, count=len(self.words)
+        )
+
+
+class EncodedCorpus(Mapping):
+    """Read-only mapping of author -> uint32 word id array."""
+
+    def __init__(self, vocabulary=None):
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self._texts = dict()
+
+    def __getitem__(self, author):
+        return self._texts[author]
+
+    def __iter__(self):
+        return iter(self._texts)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, author, ids):
+        """Stores the word ids of an author as one contiguous array."""
+        self._texts[author] = np.ascontiguousarray(ids, dtype=np.uint32)
+
+    def add_words(self, author, words):
+        """Encodes a word list and stores it for an author."""
+        self.add(author, self.vocabulary.encode(words))
+
+    def counts(self, author, start=0, stop=None):
+        """Returns the count of every vocabulary word in a slice of an author's text."""
+        return np.bincount(
+            self._texts[author][start:stop], minlength=len(self.vocabulary)
+        )
+
+    def words(self, author, start=0, stop=None):
+        """Returns a slice of an author's text as a list of words."""
+        return self.vocabulary.decode(self._texts[author][start:stop])
+
+    def nbytes(self):
+        """Returns the memory used by the id arrays."""
+        return sum(ids.nbytes for ids in self._texts.values())
@@ -0,0 +1,83 @@
+"""
+Burrows' Delta over the most frequent words of a set of known authors.
+
+Relative frequencies of the top-N words are turned into z-scores across the
+known authors; the Delta of a text to an author is the mean absolute
+difference of their z-scores. All authors are scored in one matrix pass.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+NUM_WORDS = 500  # Most frequent words used as features
+
+
+class DeltaScorer:
+    """z-scored word frequency matrix of the known authors."""
+
+    def __init__(self, words_by_author, num_words=NUM_WORDS):
+        self.authors = list(words_by_author)
+        combined = Counter()
+        for words in words_by_author.values():
+            combined.update(words)
+        self.words = [word for word, _ in combined.most_common(num_words)]
+        self.index = {word: i for i, word in enumerate(self.words)}
+        self.fit(
+            np.vstack([self.frequencies(words) for words in words_by_author.values()])
+        )
+
+    @classmethod
+    def from_frequencies(cls, authors, words, frequencies):
+        """Builds a scorer from an (authors x words) matrix of relative frequencies."""
+        scorer = cls.__new__(cls)
+        scorer.authors = list(authors)
+        scorer.words = list(words)
+        scorer.index = {word: i for i, word in enumerate(scorer.words)}
+        scorer.fit(np.asarray(frequencies, dtype=float))
+        return scorer
+
+    def fit(self, frequencies):
+        """Computes the z-scores of the known authors from their frequency rows."""
+        self.mean = frequencies.mean(axis=0)
+        std = frequencies.std(axis=0)
+        # Words used at the same rate by every author carry no information.
+        self.columns = std > 0
+        self.std = np.where(self.columns, std, 1)
+        self.z_scores = self.standardize(frequencies)
+
+    def encode(self, words):
+        """Returns the feature index of every word, -1 for words that are not features."""
+        return np.fromiter(
+            (self.index.get(word, -1) for word in words),
+            dtype=np.intp,
+            count=len(words),
+        )
+
+    def frequencies(self, words):
+        """Returns the relative frequencies of the feature words in a word list."""
+        ids = self.encode(words)
+        counts = np.bincount(ids[ids >= 0], minlength=len(self.words))
+        return counts / max(len(words), 1)
+
+    def standardize(self, frequencies):
+        """Returns z-scores of frequency rows against the known authors."""
+        return ((frequencies - self.mean) / self.std)[..., self.columns]
+
+    def score(self, words):
+        """Returns Burrows' Delta of the text to every author (lower is closer)."""
+        return self.score_frequencies(self.frequencies(words))
+
+    def score_frequencies(self, frequencies):
+        """
+        Returns Burrows' Delta of a row of relative frequencies to every author,
+        or a (texts x authors) array for a 2-D array of rows.
+        """
+        z_text = self.standardize(frequencies)[..., np.newaxis, :]
+        return np.abs(self.z_scores - z_text).mean(axis=-1)
+
+    def ranking(self, words):
+        """Returns (author, delta) pairs from the closest to the farthest author."""
+        deltas = self.score(words)
+        order = np.argsort(deltas)
+        return [(self.authors[i], float(deltas[i])) for i in order]
@@ -0,0 +1,137 @@
+"""
+Fast regex tokenizer for the word-frequency tests.
+
+The stylometry tests keep only alphabetic tokens, so instead of Punkt sentence
+splitting and the Treebank regexes this tokenizer scans the raw text once for
+word chunks and applies the few Treebank rules that change alphabetic tokens
+(contractions, quotes, sentence-final periods). Punctuation is not returned.
+The verify command measures how far it drifts from nltk.word_tokenize.
+"""
+
+import argparse
+import difflib
+import re
+import time
+from collections import Counter
+
+import nltk
+
+REGEX_VERSION = "regex-1"
+# Characters Treebank keeps inside a token; everything else splits.
+CHUNK_RE = re.compile(r"[\w'./*+=|~^\\-]+")
+CONTRACTION_RE = re.compile(r"(?i)^(.+?)(n't|'s|'m|'d|'ll|'re|'ve)$")
+SPLIT_WORDS = {
+    "cannot": 3,
+    "gimme": 3,
+    "gonna": 3,
+    "gotta": 3,
+    "lemme": 3,
+    "wanna": 3,
+}
+ABBREVIATIONS = frozenset(
+    "mr mrs ms dr st messrs mme prof rev col capt gen lt sgt jr sr vs etc".split()
+)
+
+
+def regex_tokenize(text):
+    """Returns the alphabetic tokens of a text, split the way nltk.word_tokenize does."""
+    tokens = []
+    append = tokens.append
+    for chunk in CHUNK_RE.findall(text):
+        if chunk.isalpha():
+            cut = SPLIT_WORDS.get(chunk.lower())
+            if cut:
+                append(chunk[:cut])
+                chunk = chunk[cut:]
+            append(chunk)
+            continue
+        for piece in chunk.split("--"):
+            piece = piece.lstrip("'")
+            core = piece.rstrip(".'")
+            # Abbreviations keep their period and are not alphabetic tokens.
+            if (
+                piece[len(core) : len(core) + 1] == "."
+                and core.lower() in ABBREVIATIONS
+            ):
+                continue
+            match = CONTRACTION_RE.match(core)
+            if match:
+                core = match.group(1)
+            if core.isalpha():
+                append(core)
+    return tokens
+
+
+def alphabetic(tokens):
+    """Returns the lowercase alphabetic tokens the stylometry tests use."""
+    return [token.lower() for token in tokens if token.isalpha()]
+
+
+def compare(text, examples=10):
+    """
+    Returns a report of the token-level differences between the regex tokenizer and
+    nltk.word_tokenize on the alphabetic tokens of a text.
+    """
+    start = time.perf_counter()
+    reference = alphabetic(nltk.word_tokenize(text))
+    nltk_time = time.perf_counter() - start
+    start = time.perf_counter()
+    fast = alphabetic(regex_tokenize(text))
+    regex_time = time.perf_counter() - start
+
+    changes = Counter()
+    differing = 0
+    matcher = difflib.SequenceMatcher(None, reference, fast, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            differing += max(i2 - i1, j2 - j1)
+            changes[(" ".join(reference[i1:i2]), " ".join(fast[j1:j2]))] += 1
+
+    reference_counts, fast_counts = Counter(reference), Counter(fast)
+    frequency_distance = sum(
+        abs(reference_counts[word] / len(reference) - fast_counts[word] / len(fast))
+        for word in reference_counts.keys() | fast_counts.keys()
+    )
+    return {
+        "nltk_tokens": len(reference),
+        "regex_tokens": len(fast),
+        "differing_tokens": differing,
+        "difference_rate": differing / max(len(reference), 1),
+        "frequency_distance": frequency_distance,
+        "nltk_seconds": nltk_time,
+        "regex_seconds": regex_time,
+        "examples": changes.most_common(examples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares the regex tokenizer with nltk.word_tokenize."
+    )
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--examples", type=int, default=10)
+    args = parser.parse_args()
+
+    for filename in args.files:
+        with open(filename, encoding="utf-8") as infile:
+            report = compare(infile.read(), args.examples)
+        speedup = report["nltk_seconds"] / max(report["regex_seconds"], 1e-9)
+        print(f"\n{filename}")
+        print(
+            f"    tokens: nltk {report['nltk_tokens']}, regex {report['regex_tokens']}"
+        )
+        print(
+            f"    differing tokens: {report['differing_tokens']} "
+            f"({report['difference_rate']:.3%})"
+        )
+        print(f"    word frequency distance (L1): {report['frequency_distance']:.4f}")
+        print(
+            f"    time: nltk {report['nltk_seconds']:.3f} s, "
+            f"regex {report['regex_seconds']:.3f} s ({speedup:.1f}x)"
+        )
+        for (nltk_tokens, regex_tokens), count in report["examples"]:
+            print(f"    {count:5d}  {nltk_tokens!r:30} -> {regex_tokens!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Compiled author profiles for batch attribution.
+
+A known author's corpus is compiled once into a versioned profile directory:
+word counts keyed by 64-bit word hashes, a word length histogram and a MinHash
+signature. Profiles are loaded memory-mapped, so scoring an unknown document
+only tokenizes that document.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+from stylo.delta import NUM_WORDS, DeltaScorer
+from stylo.minhash import NUM_PERM, SEED, MinHasher
+from stylo.parallel import tokenize_authors
+from stylo.registry import length_histogram, read_texts
+from stylo.stats import CHI_SQUARE_WORDS, chi_square
+from stylo.token_cache import TOKENIZER_VERSION
+
+PROFILE_VERSION = 2  # 2 added the first-use ranks for chi-square ties
+
+
+def hash_words(words):
+    """Returns stable 64-bit hashes of a sequence of words."""
+    return np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little"
+            )
+            for word in words
+        ),
+        dtype=np.uint64,
+        count=len(words),
+    )
+
+
+class WordCounts:
+    """
+    Word counts sorted by word hash for vectorized lookups. ranks holds the order
+    in which the words were first used, which breaks ties like FreqDist.most_common.
+    """
+
+    def __init__(self, hashes, counts, ranks, num_words):
+        self.hashes = hashes
+        self.counts = counts
+        self.ranks = ranks
+        self.num_words = num_words
+
+    @classmethod
+    def from_words(cls, words):
+        counts = Counter(words)  # Keys in order of first use
+        hashes = hash_words(list(counts))
+        order = np.argsort(hashes)
+        values = np.fromiter(counts.values(), dtype=np.uint32, count=len(counts))
+        ranks = np.arange(len(counts), dtype=np.uint32)
+        return cls(hashes[order], values[order], ranks[order], len(words))
+
+    def lookup(self, hashes, values=None):
+        """
+        Returns the counts (or other per-word values) of the given word hashes,
+        0 for unseen words.
+        """
+        values = self.counts if values is None else values
+        if not self.hashes.size:
+            return np.zeros(len(hashes), dtype=values.dtype)
+        positions = np.minimum(
+            np.searchsorted(self.hashes, hashes), self.hashes.size - 1
+        )
+        found = self.hashes[positions] == hashes
+        return np.where(found, values[positions], 0)
+
+
+def build_profile(path, author, words, sources=()):
+    """Compiles the word list of a known author into a profile directory."""
+    word_counts = WordCounts.from_words(words)
+    os.makedirs(path, exist_ok=True)
+    arrays = {
+        "hashes": word_counts.hashes,
+        "counts": word_counts.counts,
+        "ranks": word_counts.ranks,
+        "lengths": length_histogram(words).astype(np.uint32),
+        "signature": MinHasher(NUM_PERM, SEED).signature(words),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), array)
+    meta = {
+        "version": PROFILE_VERSION,
+        "tokenizer": TOKENIZER_VERSION,
+        "author": author,
+        "num_words": len(words),
+        "num_perm": NUM_PERM,
+        "seed": SEED,
+        "sources": list(sources),
+    }
+    # The metadata is written last, so a profile is complete once it exists.
+    with open(os.path.join(path, "profile.json"), "w", encoding="utf-8") as outfile:
+        json.dump(meta, outfile, indent=2)
+
+
+class AuthorProfile:
+    """Memory-mapped arrays of a compiled profile."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "profile.json"), encoding="utf-8") as infile:
+            meta = json.load(infile)
+        if meta["version"] != PROFILE_VERSION:
+            raise ValueError(
+                f"{path}: profile version {meta['version']}, expected {PROFILE_VERSION}"
+            )
+        if meta["tokenizer"] != TOKENIZER_VERSION:
+            raise ValueError(
+                f"{path}: built with tokenizer {meta['tokenizer']}, "
+                f"current is {TOKENIZER_VERSION}"
+            )
+        self.author = meta["author"]
+        self.meta = meta
+
+        def load(name):
+            return np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+
+        self.words = WordCounts(
+            load("hashes"), load("counts"), load("ranks"), meta["num_words"]
+        )
+        self.lengths = load("lengths")
+        self.signature = load("signature")
+
+
+class ProfileLibrary:
+    """All compiled profiles of a directory, scored together."""
+
+    def __init__(self, path, num_words=NUM_WORDS):
+        self.profiles = [
+            AuthorProfile(os.path.join(path, entry))
+            for entry in sorted(os.listdir(path))
+            if os.path.exists(os.path.join(path, entry, "profile.json"))
+        ]
+        if not self.profiles:
+            raise ValueError(f"No profiles found in {path}")
+        self.authors = [profile.author for profile in self.profiles]
+        self.lengths = np.vstack([p.lengths for p in self.profiles]).astype(float)
+        self.lengths /= np.maximum(self.lengths.sum(axis=1, keepdims=True), 1)
+        self.signatures = np.vstack([p.signature for p in self.profiles])
+        meta = self.profiles[0].meta
+        self.hasher = MinHasher(meta["num_perm"], meta["seed"])
+
+        # Delta needs z-scores across authors, so it is only defined for two or more.
+        self.delta = None
+        if len(self.profiles) > 1:
+            hashes = np.concatenate([p.words.hashes for p in self.profiles])
+            counts = np.concatenate([p.words.counts for p in self.profiles])
+            unique, inverse = np.unique(hashes, return_inverse=True)
+            totals = np.bincount(inverse, weights=counts)
+            top = unique[np.argsort(-totals, kind="stable")[:num_words]]
+            frequencies = np.vstack(
+                [p.words.lookup(top) / p.words.num_words for p in self.profiles]
+            )
+            self.delta = DeltaScorer.from_frequencies(self.authors, top, frequencies)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def chi_square(self, text):
+        """
+        Returns the chi-square of every author against a text over the most common
+        words of the two combined, chosen like FreqDist.most_common: ties are ordered
+        by first use in the author's corpus, then in the text.
+        """
+        scores = np.empty(len(self))
+        for i, profile in enumerate(self.profiles):
+            words = profile.words
+            candidates = np.union1d(words.hashes, text.hashes)
+            observed = words.lookup(candidates).astype(float)
+            combined = observed + text.lookup(candidates)
+            first_use = np.where(
+                observed > 0,
+                words.lookup(candidates, words.ranks).astype(np.int64),
+                words.hashes.size
+                + text.lookup(candidates, text.ranks).astype(np.int64),
+            )
+            keep = np.lexsort((first_use, -combined))[:CHI_SQUARE_WORDS]
+            proportion = words.num_words / (words.num_words + text.num_words)
+            scores[i] = chi_square(observed[keep], combined[keep], proportion)
+        return scores
+
+    def jaccard(self, texts):
+        """Returns a (texts x authors) array of Jaccard indexes of the vocabularies."""
+        hashes = np.concatenate([text.hashes for text in texts])
+        bounds = np.cumsum([0] + [text.hashes.size for text in texts])
+        sizes = np.diff(bounds)
+        scores = np.empty((len(texts), len(self)))
+        for i, profile in enumerate(self.profiles):
+            # Shared words of every text from one lookup of all their hashes.
+            found = np.concatenate([[0], np.cumsum(profile.words.lookup(hashes) > 0)])
+            shared = found[bounds[1:]] - found[bounds[:-1]]
+            scores[:, i] = shared / np.maximum(
+                profile.words.hashes.size + sizes - shared, 1
+            )
+        return scores
+
+    def score(self, words):
+        """Returns a dictionary of score arrays (one score per author) for every test."""
+        return self.score_batch([words])[0]
+
+    def score_batch(self, documents):
+        """
+        Returns the score dictionaries of several word lists. Every test but
+        chi-square is computed for the whole batch with one array operation.
+        """
+        texts = [WordCounts.from_words(words) for words in documents]
+        sizes = np.array([max(len(words), 1) for words in documents])[:, np.newaxis]
+        lengths = np.vstack([length_histogram(words) for words in documents]) / sizes
+        signatures = np.vstack([self.hasher.signature(words) for words in documents])
+        batch = {
+            "chi_square": np.vstack([self.chi_square(text) for text in texts]),
+            "jaccard": self.jaccard(texts),
+            "minhash": (self.signatures[np.newaxis] == signatures[:, np.newaxis]).mean(
+                axis=2
+            ),
+            "word_length": np.abs(
+                self.lengths[np.newaxis] - lengths[:, np.newaxis]
+            ).sum(axis=2),
+        }
+        if self.delta is not None:
+            words = np.asarray(self.delta.words)
+            frequencies = np.vstack([text.lookup(words) for text in texts]) / sizes
+            batch["delta"] = self.delta.score_frequencies(frequencies)
+        return [
+            {test: scores[row] for test, scores in batch.items()}
+            for row in range(len(documents))
+        ]
+
+    def ranking(self, scores, test):
+        """Returns the authors ordered from the most to the least likely for a test."""
+        order = np.argsort(scores[test])
+        if test in ("jaccard", "minhash"):
+            order = order[::-1]
+        return [self.authors[i] for i in order]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compiles author profiles and attributes documents against them."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile a known author's corpus")
+    build.add_argument("profile_dir", help="directory holding all profiles")
+    build.add_argument("author")
+    build.add_argument("files", nargs="+")
+    attribute = commands.add_parser("attribute", help="score unknown documents")
+    attribute.add_argument("profile_dir")
+    attribute.add_argument("unknown", nargs="+")
+    attribute.add_argument("--top", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        words = tokenize_authors({args.author: read_texts(args.files)})[args.author]
+        path = os.path.join(args.profile_dir, args.author)
+        build_profile(path, args.author, words, args.files)
+        print(f"Compiled {len(words)} words of {args.author} into {path}")
+        return
+
+    library = ProfileLibrary(args.profile_dir)
+    documents = tokenize_authors(
+        {filename: read_texts([filename]) for filename in args.unknown}
+    )
+    batch = library.score_batch(list(documents.values()))
+    for (filename, words), scores in zip(documents.items(), batch):
+        print(f"\n{filename} ({len(words)} words)")
+        for test in scores:
+            ranked = library.ranking(scores, test)[: args.top]
+            results = ", ".join(
+                f"{author} {scores[test][library.authors.index(author)]:.4f}"
+                for author in ranked
+            )
+            print(f"    {test:12} {results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+MinHash signatures and a locality-sensitive hashing index for Jaccard search.
+
+Every known text is reduced to NUM_PERM minimum hash values of its vocabulary.
+Texts whose signatures agree on a whole band of rows land in the same bucket,
+so a query only compares the unknown text with a short list of candidates;
+exact Jaccard indexes are then computed for that short list alone.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import defaultdict
+
+import numpy as np
+
+from stylo.parallel import words_from_text
+from stylo.registry import iter_corpus_dir, read_texts
+
+NUM_PERM = 128
+BANDS = 32  # 4 rows per band, candidates above a Jaccard index of about 0.42
+SEED = 1
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+HASH_BLOCK = 4096  # Words hashed at a time, bounds the temporary arrays
+
+
+def word_hashes(words):
+    """Returns stable 32-bit hashes of the unique words."""
+    unique = set(words)
+    return np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(word.encode("utf-8"), digest_size=4).digest(), "little"
+            )
+            for word in unique
+        ),
+        dtype=np.uint64,
+        count=len(unique),
+    )
+
+
+def exact_jaccard(words, other_words):
+    """Returns the Jaccard index of the vocabularies of two word lists."""
+    unique, other = set(words), set(other_words)
+    union = len(unique | other)
+    return len(unique & other) / union if union else 0.0
+
+
+class MinHasher:
+    """Computes MinHash signatures with NUM_PERM universal hash functions."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=SEED):
+        generator = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = generator.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = generator.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, words):
+        """Returns the uint32 signature of the vocabulary of a word list."""
+        hashes = word_hashes(words)
+        signature = np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        for start in range(0, hashes.size, HASH_BLOCK):
+            block = hashes[start : start + HASH_BLOCK, np.newaxis]
+            # Products may wrap around 2**64, which is harmless for hashing.
+            values = (block * self.a + self.b) % MERSENNE_PRIME & MAX_HASH
+            np.minimum(signature, values.min(axis=0), out=signature)
+        return signature.astype(np.uint32)
+
+
+class MinHashIndex:
+    """Signature store with banded LSH buckets."""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, seed=SEED):
+        if num_perm % bands:
+            raise ValueError(f"num_perm={num_perm} is not divisible by bands={bands}")
+        self.hasher = MinHasher(num_perm, seed)
+        self.seed = seed
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.names = []
+        self.sources = []
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._pending = []
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.names)
+
+    def _band_keys(self, signature):
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, doc_id, signature):
+        for bucket, key in zip(self.buckets, self._band_keys(signature)):
+            bucket[key].append(doc_id)
+
+    def add(self, name, words, sources=()):
+        """Adds a text to the index; sources are the files used for exact scoring."""
+        signature = self.hasher.signature(words)
+        self._insert(len(self.names), signature)
+        self.names.append(name)
+        self.sources.append(list(sources))
+        self._pending.append(signature)
+
+    def _stack(self):
+        if self._pending:
+            self.signatures = np.vstack([self.signatures] + self._pending)
+            self._pending = []
+        return self.signatures
+
+    def query(self, words, top=10):
+        """
+        Returns up to `top` (name, estimated Jaccard) pairs from the LSH candidates,
+        falling back to every signature when the buckets hold fewer than `top` texts.
+        """
+        signatures = self._stack()
+        signature = self.hasher.signature(words)
+        candidates = set()
+        for bucket, key in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        ids = np.array(sorted(candidates), dtype=np.intp)
+        if ids.size < top:
+            ids = np.arange(len(self.names))
+        estimates = (signatures[ids] == signature).mean(axis=1)
+        order = np.argsort(-estimates, kind="stable")[:top]
+        return [(self.names[ids[i]], float(estimates[i])) for i in order]
+
+    def rerank(self, words, shortlist):
+        """Returns the shortlist rescored with exact Jaccard indexes, best first."""
+        positions = {name: i for i, name in enumerate(self.names)}
+        scored = []
+        for name, _ in shortlist:
+            sources = self.sources[positions[name]]
+            other_words = words_from_text(read_texts(sources))
+            scored.append((name, exact_jaccard(words, other_words)))
+        return sorted(scored, key=lambda item: -item[1])
+
+    def save(self, path):
+        """Writes the signatures and names to a directory."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "signatures.npy"), self._stack())
+        meta = {
+            "num_perm": self.hasher.num_perm,
+            "bands": self.bands,
+            "seed": self.seed,
+            "names": self.names,
+            "sources": self.sources,
+        }
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as outfile:
+            json.dump(meta, outfile)
+
+    @classmethod
+    def load(cls, path):
+        """Reads an index written by save() and rebuilds its buckets."""
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as infile:
+            meta = json.load(infile)
+        index = cls(meta["num_perm"], meta["bands"], meta["seed"])
+        index.names = meta["names"]
+        index.sources = meta["sources"]
+        index.signatures = np.load(os.path.join(path, "signatures.npy"))
+        for doc_id, signature in enumerate(index.signatures):
+            index._insert(doc_id, signature)
+        return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MinHash LSH index of known texts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="index a corpus directory")
+    build.add_argument("corpus_dir")
+    build.add_argument("index_dir")
+    query = commands.add_parser("query", help="find texts similar to an unknown one")
+    query.add_argument("index_dir")
+    query.add_argument("unknown")
+    query.add_argument("--top", type=int, default=10)
+    query.add_argument(
+        "--exact", action="store_true", help="rescore the shortlist exactly"
+    )
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = MinHashIndex()
+        for author, filenames in iter_corpus_dir(args.corpus_dir):
+            index.add(author, words_from_text(read_texts(filenames)), filenames)
+        index.save(args.index_dir)
+        print(f"Indexed {len(index)} texts in {args.index_dir}")
+        return
+
+    index = MinHashIndex.load(args.index_dir)
+    with open(args.unknown, encoding="utf-8") as infile:
+        words = words_from_text(infile.read())
+    results = index.query(words, args.top)
+    if args.exact:
+        results = index.rerank(words, results)
+    for name, score in results:
+        print(f"{name:30} {score:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Parallel per-author feature extraction.
+
+Every author's corpus is cut into chunks that are tokenized on a process pool;
+the per-chunk results are merged afterwards, either as word lists or as an
+integer-encoded corpus.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+import nltk
+import numpy as np
+from nltk.corpus import stopwords
+
+from stylo.corpus import EncodedCorpus
+from stylo.fast_tokenize import REGEX_VERSION, regex_tokenize
+from stylo.token_cache import TOKENIZER_VERSION, tokenize_encoded, word_tokenize
+
+TEXT_CHUNK_SIZE = 200_000  # Characters per tokenization task
+# Tokenizer and cache version by name; "regex" keeps only word tokens.
+TOKENIZERS = {
+    "nltk": (nltk.word_tokenize, TOKENIZER_VERSION),
+    "regex": (regex_tokenize, REGEX_VERSION),
+}
+
+
+def split_text(text, chunk_size=TEXT_CHUNK_SIZE):
+    """Splits a text into pieces of about chunk_size characters at paragraph breaks."""
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        if end < len(text):
+            cut = text.rfind("\n\n", start, end)
+            if cut <= start:
+                cut = text.rfind(" ", start, end)
+            if cut > start:
+                end = cut
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+def words_from_text(text, tokenizer="nltk"):
+    """Returns the lowercase alphabetic tokens of a text."""
+    tokens = word_tokenize(text, *TOKENIZERS[tokenizer])
+    return [token.lower() for token in tokens if token.isalpha()]
+
+
+@lru_cache(maxsize=None)
+def stop_words():
+    """Loads the English stopwords once per process."""
+    return frozenset(stopwords.words("english"))
+
+
+def tokenize_authors(
+    strings_by_author, workers=None, chunk_size=TEXT_CHUNK_SIZE, tokenizer="nltk"
+):
+    """Returns a dictionary of word lists, tokenizing the chunks of all texts in parallel."""
+    tasks = [
+        (author, piece)
+        for author, text in strings_by_author.items()
+        for piece in split_text(text, chunk_size)
+    ]
+    words_by_author = {author: [] for author in strings_by_author}
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(
+            partial(words_from_text, tokenizer=tokenizer),
+            [piece for _, piece in tasks],
+        )
+        for (author, _), words in zip(tasks, results):
+            words_by_author[author].extend(words)
+    return words_by_author
+
+
+def encode_text(text, tokenizer="nltk"):
+    """
+    Returns (words, ids) for the lowercase alphabetic tokens of a text,
+    where words is the local vocabulary and ids a uint32 array into it.
+    """
+    vocab, token_ids = tokenize_encoded(text, *TOKENIZERS[tokenizer])
+    words = dict()
+    remap = np.fromiter(
+        (
+            words.setdefault(token.lower(), len(words)) if token.isalpha() else -1
+            for token in vocab
+        ),
+        dtype=np.int64,
+        count=len(vocab),
+    )
+    ids = remap[np.asarray(token_ids, dtype=np.intp)]
+    return list(words), ids[ids >= 0].astype(np.uint32)
+
+
+def encode_authors(
+    strings_by_author, workers=None, chunk_size=TEXT_CHUNK_SIZE, tokenizer="nltk"
+):
+    """
+    Returns an EncodedCorpus of all texts, tokenizing their chunks in parallel.
+    Workers send back small local vocabularies that are merged into the shared one.
+    """
+    tasks = [
+        (author, piece)
+        for author, text in strings_by_author.items()
+        for piece in split_text(text, chunk_size)
+    ]
+    corpus = EncodedCorpus()
+    pieces_by_author = {author: [] for author in strings_by_author}
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(
+            partial(encode_text, tokenizer=tokenizer), [piece for _, piece in tasks]
+        )
+        for (author, _), (words, ids) in zip(tasks, results):
+            remap = corpus.vocabulary.encode(words)
+            pieces_by_author[author].append(remap[ids])
+    for author, pieces in pieces_by_author.items():
+        corpus.add(author, np.concatenate(pieces) if pieces else [])
+    return corpus
@@ -0,0 +1,70 @@
+"""
+Batched and cached part of speech tagging.
+
+Token streams are tagged in sentence batches, optionally on a process pool, and
+the tag sequence is stored under the hash of the token stream, so unchanged
+text is never tagged twice.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import nltk
+
+from stylo.token_cache import cache_key, load_encoded, save_tokens
+
+CACHE_DIR = ".pos_cache"
+TAGGER_VERSION = f"nltk-{nltk.__version__}-averaged_perceptron"
+BATCH_SIZE = 2000  # Maximum tokens per tagging batch
+SENTENCE_ENDS = frozenset(".!?")
+
+
+def sentence_batches(tokens, batch_size=BATCH_SIZE):
+    """
+    Returns (start, end) ranges that group whole sentences into batches of at most
+    batch_size tokens. Word lists without sentence punctuation are cut every batch_size tokens.
+    """
+    batches = []
+    start = 0
+    last_end = 0
+    for i, token in enumerate(tokens, start=1):
+        if token in SENTENCE_ENDS:
+            last_end = i
+        if i - start >= batch_size:
+            end = last_end if last_end > start else i
+            batches.append((start, end))
+            start = end
+    if start < len(tokens):
+        batches.append((start, len(tokens)))
+    return batches
+
+
+def tag_batch(tokens):
+    """Returns the tags of one batch of tokens."""
+    return [tag for _, tag in nltk.pos_tag(tokens)]
+
+
+def pos_tags(tokens, workers=None, cache_dir=CACHE_DIR, batch_size=BATCH_SIZE):
+    """
+    Returns the list of POS tags for a token stream, reading it from the cache when possible.
+    workers=1 tags the batches in this process.
+    """
+    tokens = list(tokens)
+    # Tags differ at batch boundaries, so the batch size is part of the key.
+    version = f"{TAGGER_VERSION}-batch{batch_size}"
+    prefix = os.path.join(cache_dir, cache_key("\n".join(tokens), version))
+    if os.path.exists(prefix + ".vocab.txt") and os.path.exists(prefix + ".ids.npy"):
+        vocab, ids = load_encoded(prefix)
+        return [vocab[i] for i in ids.tolist()]
+
+    batches = [tokens[start:end] for start, end in sentence_batches(tokens, batch_size)]
+    if workers == 1 or len(batches) < 2:
+        tagged = map(tag_batch, batches)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            tagged = list(pool.map(tag_batch, batches))
+    tags = [tag for batch in tagged for tag in batch]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    save_tokens(prefix, tags)
+    return tags
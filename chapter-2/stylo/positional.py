@@ -0,0 +1,163 @@
+"""
+Positional inverted index over a cached token stream.
+
+The token ids of a text are sorted once into postings: the positions of every
+vocabulary entry stored back to back, with a start offset per entry. Both
+arrays are saved next to the token cache entry and loaded memory-mapped, so
+word offsets and co-occurrences are answered without scanning the text.
+"""
+
+import argparse
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from stylo.binning import BINS, bin_positions
+from stylo.registry import read_texts
+from stylo.token_cache import (
+    CACHE_DIR,
+    TOKENIZER_VERSION,
+    cache_key,
+    load_encoded,
+    tokenize_encoded,
+)
+
+
+class PositionalIndex:
+    """Token positions of every vocabulary entry of one text."""
+
+    def __init__(self, vocab, postings, starts):
+        self.vocab = vocab
+        self.index = {token: i for i, token in enumerate(vocab)}
+        self.postings = postings
+        self.starts = starts
+        self.num_tokens = len(postings)
+
+    @classmethod
+    def from_text(cls, text, cache_dir=CACHE_DIR):
+        """Loads the index of a text, tokenizing and indexing it on first use."""
+        prefix = os.path.join(cache_dir, cache_key(text, TOKENIZER_VERSION))
+        if os.path.exists(prefix + ".postings.npy") and os.path.exists(
+            prefix + ".starts.npy"
+        ):
+            vocab, _ = load_encoded(prefix)
+            return cls(
+                vocab,
+                np.load(prefix + ".postings.npy", mmap_mode="r"),
+                np.load(prefix + ".starts.npy", mmap_mode="r"),
+            )
+        vocab, ids = tokenize_encoded(text, cache_dir=cache_dir)
+        postings = np.argsort(ids, kind="stable").astype(np.uint32)
+        starts = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ids, minlength=len(vocab)), out=starts[1:])
+        # Written like save_tokens, so an interrupted run never leaves half an index.
+        for name, array in [("postings", postings), ("starts", starts)]:
+            with open(f"{prefix}.{name}.tmp", "wb") as outfile:
+                np.save(outfile, array)
+        for name in ["postings", "starts"]:
+            os.replace(f"{prefix}.{name}.tmp", f"{prefix}.{name}.npy")
+        return cls(vocab, postings, starts)
+
+    def offsets(self, word, ignore_case=False):
+        """Returns the sorted token positions of a word."""
+        if not ignore_case:
+            i = self.index.get(word)
+            if i is None:
+                return np.zeros(0, dtype=np.uint32)
+            return self.postings[self.starts[i] : self.starts[i + 1]]
+        word = word.lower()
+        parts = [
+            self.postings[self.starts[i] : self.starts[i + 1]]
+            for token, i in self.index.items()
+            if token.lower() == word
+        ]
+        if not parts:
+            return np.zeros(0, dtype=np.uint32)
+        return np.sort(np.concatenate(parts))
+
+    def cooccurrences(self, word, other, k, ignore_case=False):
+        """Returns the positions of word that have other within k tokens."""
+        positions = self.offsets(word, ignore_case).astype(np.int64)
+        others = self.offsets(other, ignore_case).astype(np.int64)
+        left = np.searchsorted(others, positions - k)
+        right = np.searchsorted(others, positions + k, side="right")
+        counts = right - left
+        same = word.lower() == other.lower() if ignore_case else word == other
+        if same:
+            # Every occurrence is within k tokens of itself.
+            counts -= 1
+        return positions[counts > 0]
+
+
+def dispersion_plot(index, words, ignore_case=False, bins=None):
+    """
+    Plots the offsets of every word along the text, like nltk.Text.dispersion_plot.
+    With bins, draws one density strip per word from that many positional buckets.
+    """
+    fig, ax = plt.subplots()
+    if bins:
+        density = np.vstack(
+            [
+                bin_positions(index.offsets(word, ignore_case), index.num_tokens, bins)
+                for word in words
+            ]
+        )
+        ax.imshow(
+            density,
+            aspect="auto",
+            cmap="Greys",
+            interpolation="nearest",
+            extent=(0, index.num_tokens, len(words) - 0.5, -0.5),
+        )
+        ax.set_yticks(range(len(words)))
+        ax.set_yticklabels(words)
+    else:
+        for row, word in enumerate(reversed(words)):
+            positions = index.offsets(word, ignore_case)
+            ax.plot(positions, np.full(positions.size, row), "|", markersize=12)
+        ax.set_yticks(range(len(words)))
+        ax.set_yticklabels(list(reversed(words)))
+        ax.set_ylim(-1, len(words))
+    ax.set_xlim(0, index.num_tokens)
+    ax.set_title("Lexical Dispersion Plot")
+    ax.set_xlabel("Word Offset")
+    plt.show(block=True)
+    return ax
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answers word offset and co-occurrence queries from an index."
+    )
+    parser.add_argument("files", nargs="+", help="text files read as one work")
+    parser.add_argument("--words", nargs="+", required=True)
+    parser.add_argument(
+        "--near", type=int, help="report pairs of words within this many tokens"
+    )
+    parser.add_argument("--ignore-case", action="store_true")
+    parser.add_argument("--plot", action="store_true")
+    parser.add_argument(
+        "--bins",
+        type=int,
+        nargs="?",
+        const=BINS,
+        help="plot density strips from this many positional buckets",
+    )
+    args = parser.parse_args()
+
+    index = PositionalIndex.from_text(read_texts(args.files))
+    for word in args.words:
+        positions = index.offsets(word, args.ignore_case)
+        print(f"{word:20} {positions.size:6d} occurrences, first at {positions[:5]}")
+    if args.near is not None:
+        for i, word in enumerate(args.words):
+            for other in args.words[i + 1 :]:
+                near = index.cooccurrences(word, other, args.near, args.ignore_case)
+                print(f"{word} within {args.near} tokens of {other}: {near.size}")
+    if args.plot:
+        dispersion_plot(index, args.words, args.ignore_case, args.bins)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Single-pass stylometric profiles.
+
+Every author's word ids are counted once with np.bincount over the shared
+vocabulary; word lengths, stopwords, the vocabulary and the chi-square counts
+are all derived from those counts, so the individual tests only query the
+profile instead of walking the corpus again.
+"""
+
+import nltk
+import numpy as np
+
+from stylo.parallel import stop_words
+from stylo.pos_cache import pos_tags
+
+
+class StyleProfile:
+    """Word counts of one encoded text, split at the length of the shortest corpus."""
+
+    def __init__(self, corpus, author, len_shortest_corpus, tags=None):
+        self.vocabulary = corpus.vocabulary
+        self.head_counts = corpus.counts(author, stop=len_shortest_corpus)
+        self.counts = self.head_counts + corpus.counts(
+            author, start=len_shortest_corpus
+        )
+        self.num_head_words = int(self.head_counts.sum())
+        self.num_words = len(corpus[author])
+        # Position of the first use of every word (num_words if unused), for ordering ties.
+        unique, first = np.unique(np.asarray(corpus[author]), return_index=True)
+        self.first_positions = np.full(len(self.vocabulary), self.num_words, np.int64)
+        self.first_positions[unique] = first
+        self.tags = tags
+
+    @property
+    def presence(self):
+        """Boolean mask of the words used within the length of the shortest corpus."""
+        return self.head_counts > 0
+
+    def _freq_dist(self, keys, counts):
+        nonzero = np.flatnonzero(counts)
+        return nltk.FreqDist(
+            dict(zip(np.asarray(keys)[nonzero].tolist(), counts[nonzero].tolist()))
+        )
+
+    def word_lengths(self):
+        """Returns a FreqDist of word lengths within the length of the shortest corpus."""
+        counts = np.bincount(
+            self.vocabulary.lengths(), weights=self.head_counts
+        ).astype(np.int64)
+        return self._freq_dist(np.arange(counts.size), counts)
+
+    def stopwords(self):
+        """Returns a FreqDist of stopwords within the length of the shortest corpus."""
+        mask = self.vocabulary.mask(stop_words())
+        return self._freq_dist(
+            self.vocabulary.words, np.where(mask, self.head_counts, 0)
+        )
+
+    def parts_of_speech(self):
+        """
+        Returns a FreqDist of POS tags within the length of the shortest corpus.
+        The words carry no sentence ends, so tags near batch boundaries are approximate.
+        """
+        return nltk.FreqDist(self.tags)
+
+
+def build_profiles(corpus, len_shortest_corpus, tag=True, workers=None):
+    """Returns a StyleProfile for every author of an EncodedCorpus."""
+    profiles = dict()
+    for author in corpus:
+        # Tagging needs the words back; batches have their own pool and cache.
+        tags = None
+        if tag:
+            tags = pos_tags(corpus.words(author, stop=len_shortest_corpus), workers)
+        profiles[author] = StyleProfile(corpus, author, len_shortest_corpus, tags)
+    return profiles
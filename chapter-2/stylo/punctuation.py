@@ -0,0 +1,87 @@
+"""
+Punctuation maps of whole texts.
+
+Every punctuation mark of a text is encoded as a small integer with a single
+lookup of the cached token ids, the codes are laid out row by row in a square
+that is padded (or tiled) to fit any number of marks, and every punctuation
+class gets its own map of the same square.
+"""
+
+import math
+from string import punctuation
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from stylo.token_cache import tokenize_encoded
+
+PADDING = 0  # Code of the cells after the last mark
+CODES = {mark: code for code, mark in enumerate(punctuation, start=1)}
+
+
+def encode_punctuation(text):
+    """Returns the uint8 class codes (1..32) of the punctuation tokens of a text, in order."""
+    vocab, ids = tokenize_encoded(text)
+    table = np.fromiter(
+        (CODES.get(token, PADDING) for token in vocab), dtype=np.uint8, count=len(vocab)
+    )
+    codes = table[np.asarray(ids, dtype=np.intp)]
+    return codes[codes != PADDING]
+
+
+def square_grid(codes, tile=False):
+    """
+    Returns the codes as the smallest square that holds all of them,
+    padding the last row with PADDING or, with tile=True, repeating the text.
+    """
+    side = max(math.ceil(math.sqrt(len(codes))), 1)
+    if tile and len(codes):
+        cells = np.resize(codes, side * side)
+    else:
+        cells = np.full(side * side, PADDING, dtype=np.uint8)
+        cells[: len(codes)] = codes
+    return cells.reshape(side, side)
+
+
+def class_maps(grid, codes):
+    """Returns one boolean map of the grid per class code, shape (len(codes), side, side)."""
+    codes = np.asarray(codes, dtype=grid.dtype)
+    return grid[np.newaxis] == codes[:, np.newaxis, np.newaxis]
+
+
+def plot_class_maps(codes, title, columns=4, min_count=1, tile=False):
+    """
+    Draws the map of every punctuation class used at least min_count times.
+    The maps are tiled into one image, which renders much faster than a grid of axes.
+    """
+    counts = np.bincount(codes, minlength=len(punctuation) + 1)
+    present = [
+        code
+        for code in np.argsort(-counts, kind="stable")
+        if code != PADDING and counts[code] >= min_count
+    ]
+    maps = class_maps(square_grid(codes, tile), present)
+    side = maps.shape[1]
+    step = side + max(side // 8, 2)
+    rows = max(math.ceil(len(present) / columns), 1)
+    image = np.full((rows * step, columns * step), np.nan)
+    for i, mark_map in enumerate(maps):
+        row, column = divmod(i, columns)
+        image[row * step : row * step + side, column * step : column * step + side] = (
+            mark_map
+        )
+
+    fig, ax = plt.subplots(figsize=(3 * columns, 3 * rows))
+    ax.imshow(image, cmap="Greys", interpolation="nearest", vmin=0, vmax=1)
+    ax.set_axis_off()
+    for i, code in enumerate(present):
+        row, column = divmod(i, columns)
+        ax.text(
+            column * step + side / 2,
+            row * step - 1,
+            f"{punctuation[code - 1]!r} ({counts[code]})",
+            ha="center",
+            va="bottom",
+        )
+    fig.suptitle(title)
+    return fig
@@ -0,0 +1,248 @@
+"""
+Corpus registry and author x feature matrix for many-candidate attribution.
+
+Known-author texts are turned into one row each of function-word counts, a
+word-length histogram and (optionally) a part of speech histogram and hashed
+character n-gram counts. An unknown text is scored against every row at once
+with NumPy.
+"""
+
+import argparse
+import os
+from collections import Counter
+
+import numpy as np
+from nltk.corpus import stopwords
+
+from stylo import char_ngrams
+from stylo.parallel import tokenize_authors, words_from_text
+from stylo.pos_cache import pos_tags
+from stylo.stats import chi_square
+
+MAX_WORD_LENGTH = 20  # Longer words share the last histogram bin
+POS_TAGS = (
+    "CC CD DT EX FW IN JJ JJR JJS LS MD NN NNS NNP NNPS PDT POS PRP PRP$ "
+    "RB RBR RBS RP SYM TO UH VB VBD VBG VBN VBP VBZ WDT WP WP$ WRB"
+).split()
+
+
+def length_histogram(words):
+    """Returns the counts of word lengths 1..MAX_WORD_LENGTH (longer words share the last bin)."""
+    lengths = np.fromiter(
+        (len(word) for word in words), dtype=np.intp, count=len(words)
+    )
+    return np.bincount(
+        np.minimum(lengths, MAX_WORD_LENGTH) - 1, minlength=MAX_WORD_LENGTH
+    )
+
+
+def iter_corpus_dir(path):
+    """
+    Yields (author, filenames) for <path>/<author>.txt files
+    and <path>/<author>/*.txt directories.
+    """
+    for entry in sorted(os.listdir(path)):
+        full_path = os.path.join(path, entry)
+        if os.path.isdir(full_path):
+            filenames = [
+                os.path.join(full_path, name)
+                for name in sorted(os.listdir(full_path))
+                if name.endswith(".txt")
+            ]
+            if filenames:
+                yield entry, filenames
+        elif entry.endswith(".txt"):
+            yield entry[:-4], [full_path]
+
+
+def read_texts(filenames):
+    """Returns the contents of several text files joined into one string."""
+    texts = []
+    for filename in filenames:
+        with open(filename, encoding="utf-8") as infile:
+            texts.append(infile.read())
+    return "\n\n".join(texts)
+
+
+def load_corpus_dir(path):
+    """Returns a dictionary of texts by author from a corpus directory."""
+    return {
+        author: read_texts(filenames) for author, filenames in iter_corpus_dir(path)
+    }
+
+
+class CorpusRegistry:
+    """Author x feature matrix built from the word lists of known authors."""
+
+    def __init__(self, words_by_author, use_pos=False, use_char_ngrams=False):
+        self.use_pos = use_pos
+        self.use_char_ngrams = use_char_ngrams
+        self.hasher = char_ngrams.NgramHasher()
+        self.authors = list(words_by_author)
+        self.function_words = sorted(set(stopwords.words("english")))
+        self._function_index = {word: i for i, word in enumerate(self.function_words)}
+
+        sizes = [len(self.function_words), MAX_WORD_LENGTH]
+        names = ["function_words", "word_length"]
+        if use_pos:
+            sizes.append(len(POS_TAGS))
+            names.append("pos")
+        if use_char_ngrams:
+            sizes.append(self.hasher.num_features)
+            names.append("char_ngrams")
+        self._pos_index = {tag: i for i, tag in enumerate(POS_TAGS)}
+        bounds = np.cumsum([0] + sizes)
+        self.num_features = int(bounds[-1])
+        self.blocks = {
+            name: slice(start, stop)
+            for name, start, stop in zip(names, bounds[:-1], bounds[1:])
+        }
+
+        self.lengths = np.array([len(words) for words in words_by_author.values()])
+        self.matrix = np.zeros((len(self.authors), self.num_features))
+        for row, words in enumerate(words_by_author.values()):
+            self.matrix[row] = self.feature_vector(words)
+        self.profiles = self.relative_frequencies(self.matrix)
+
+        # Presence matrix over the shared vocabulary for the Jaccard index.
+        self.vocabulary = dict()
+        rows = [
+            np.unique(
+                [
+                    self.vocabulary.setdefault(word, len(self.vocabulary))
+                    for word in words
+                ]
+            )
+            for words in words_by_author.values()
+        ]
+        self.presence = np.zeros((len(self.authors), len(self.vocabulary)), dtype=bool)
+        for row, ids in enumerate(rows):
+            self.presence[row, ids.astype(np.intp)] = True
+        self.vocab_sizes = self.presence.sum(axis=1)
+
+    @classmethod
+    def from_texts(
+        cls, strings_by_author, use_pos=False, workers=None, use_char_ngrams=False
+    ):
+        """Tokenizes the texts in parallel and builds the registry."""
+        return cls(
+            tokenize_authors(strings_by_author, workers), use_pos, use_char_ngrams
+        )
+
+    @classmethod
+    def from_directory(cls, path, use_pos=False, workers=None, use_char_ngrams=False):
+        """Builds the registry from a directory of known-author texts."""
+        return cls.from_texts(load_corpus_dir(path), use_pos, workers, use_char_ngrams)
+
+    def feature_vector(self, words):
+        """Returns the feature counts of a word list in the column order of the matrix."""
+        vector = np.zeros(self.num_features)
+
+        counts = Counter(words)
+        block = vector[self.blocks["function_words"]]
+        for word, i in self._function_index.items():
+            block[i] = counts[word]
+
+        vector[self.blocks["word_length"]] = length_histogram(words)
+
+        if self.use_pos:
+            block = vector[self.blocks["pos"]]
+            for tag, count in Counter(pos_tags(words)).items():
+                if tag in self._pos_index:
+                    block[self._pos_index[tag]] += count
+
+        if self.use_char_ngrams:
+            # N-grams of the word stream, so punctuation and case do not count.
+            vector[self.blocks["char_ngrams"]] = self.hasher.vector(" ".join(words))
+        return vector
+
+    def relative_frequencies(self, matrix):
+        """Returns the matrix with every feature block scaled to sum to 1 per row."""
+        matrix = np.atleast_2d(matrix).astype(float)
+        scaled = np.empty_like(matrix)
+        for block in self.blocks.values():
+            totals = matrix[:, block].sum(axis=1, keepdims=True)
+            scaled[:, block] = matrix[:, block] / np.maximum(totals, 1)
+        return scaled
+
+    def chi_square(self, words, vector=None):
+        """Returns the chi-square of the function-word counts of every author against the text."""
+        if vector is None:
+            vector = self.feature_vector(words)
+        block = self.blocks["function_words"]
+        observed = self.matrix[:, block]
+        combined = observed + vector[block]
+        proportion = self.lengths / (self.lengths + len(words))
+        return chi_square(observed, combined, proportion[:, np.newaxis])
+
+    def char_chi_square(self, words, vector=None):
+        """Returns the chi-square of the character n-gram counts of every author."""
+        if vector is None:
+            vector = self.feature_vector(words)
+        block = self.blocks["char_ngrams"]
+        return char_ngrams.chi_square(self.matrix[:, block], vector[block])
+
+    def jaccard(self, words):
+        """Returns the Jaccard index of the vocabulary of every author and the text."""
+        unique = set(words)
+        ids = [self.vocabulary[word] for word in unique if word in self.vocabulary]
+        shared = self.presence[:, ids].sum(axis=1)
+        return shared / (self.vocab_sizes + len(unique) - shared)
+
+    def distance(self, words, vector=None):
+        """Returns the mean absolute difference of relative feature frequencies."""
+        if vector is None:
+            vector = self.feature_vector(words)
+        unknown = self.relative_frequencies(vector)
+        return np.abs(self.profiles - unknown).sum(axis=1) / len(self.blocks)
+
+    def attribute(self, words):
+        """Returns a dictionary of score arrays (one score per author) for every test."""
+        vector = self.feature_vector(words)
+        scores = {
+            "chi_square": self.chi_square(words, vector),
+            "jaccard": self.jaccard(words),
+            "distance": self.distance(words, vector),
+        }
+        if self.use_char_ngrams:
+            scores["char_chi_square"] = self.char_chi_square(words, vector)
+        return scores
+
+    def ranking(self, scores, test):
+        """Returns the authors ordered from the most to the least likely for a test."""
+        order = np.argsort(scores[test])
+        if test == "jaccard":
+            order = order[::-1]
+        return [self.authors[i] for i in order]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scores an unknown text against a directory of known authors."
+    )
+    parser.add_argument(
+        "corpus_dir", help="<author>.txt files or <author>/ directories"
+    )
+    parser.add_argument("unknown", help="text file of disputed authorship")
+    parser.add_argument("--pos", action="store_true", help="include parts of speech")
+    parser.add_argument(
+        "--char-ngrams", action="store_true", help="include hashed character n-grams"
+    )
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    registry = CorpusRegistry.from_directory(
+        args.corpus_dir, use_pos=args.pos, use_char_ngrams=args.char_ngrams
+    )
+    with open(args.unknown, encoding="utf-8") as infile:
+        words = words_from_text(infile.read())
+    scores = registry.attribute(words)
+    for test in scores:
+        print(f"\nMost likely authors by {test}:")
+        for author in registry.ranking(scores, test)[: args.top]:
+            i = registry.authors.index(author)
+            print(f"    {author:30} {scores[test][i]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Headless batch export of the stylometry figures.
+
+Figures are rendered by worker processes with the non-interactive Agg backend
+and written to an output directory, so a report for many authors runs without
+a display. Frequencies are turned into percentages with NumPy instead of
+copying and renormalizing every FreqDist.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+
+from stylo.parallel import TOKENIZERS, encode_authors, split_text
+from stylo.profile import build_profiles
+from stylo.punctuation import encode_punctuation, plot_class_maps
+from stylo.registry import load_corpus_dir
+
+OUTPUT_DIR = "report"
+DPI = 100
+LINES = ["-", ":", "--"]  # Line styles for graphs
+MAX_LEGEND = 10  # Comparison plots of more authors are drawn without a legend
+TESTS = {
+    # name: (StyleProfile method, samples shown, title, x label)
+    "word_length": (
+        "word_lengths",
+        15,
+        "The frequency of words of different lengths",
+        "Number of words",
+    ),
+    "stopwords": ("stopwords", 50, "The 50 most used non-indexed words", "Word"),
+    "pos": ("parts_of_speech", 35, "Parts of speech", "Parts of speech"),
+}
+
+
+def frequency_percentages(fd, max_num=None, cumulative=False):
+    """Returns the most common samples of a FreqDist and their share of all counts in %."""
+    common = fd.most_common(max_num)
+    samples = [sample for sample, _ in common]
+    counts = np.fromiter((count for _, count in common), dtype=float, count=len(common))
+    percentages = counts * (100 / max(fd.N(), 1))
+    if cumulative:
+        percentages = np.cumsum(percentages)
+    return samples, percentages
+
+
+def plot_percentages(
+    ax, samples, percentages, title=None, linewidth=2, linestyle=None, label=None
+):
+    """Draws percentages on an axis the way FreqDist.plot draws counts."""
+    ax.grid(True, color="silver")
+    ax.plot(percentages, linewidth=linewidth, linestyle=linestyle, label=label)
+    ax.set_xticks(range(len(samples)))
+    ax.set_xticklabels([str(sample) for sample in samples], rotation=90)
+    if title:
+        ax.set_title(title)
+    ax.set_xlabel("Samples")
+    ax.set_ylabel("Frequency of appearances [%]")
+
+
+def use_agg():
+    """Switches matplotlib to the non-interactive backend (pool initializer)."""
+    matplotlib.use("Agg")
+
+
+def save(fig, path):
+    # Fixed margins instead of tight_layout, which costs as much as the drawing.
+    fig.savefig(path, dpi=DPI)
+    plt.close(fig)
+
+
+def render_comparison(path, title, xlabel, series):
+    """Draws one test for all authors; series holds (author, samples, percentages)."""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    fig.subplots_adjust(bottom=0.2)
+    for i, (author, samples, percentages) in enumerate(series):
+        plot_percentages(
+            ax,
+            samples,
+            percentages,
+            title=title,
+            linestyle=LINES[i % len(LINES)],
+            label=author,
+        )
+    ax.set_xlabel(xlabel)
+    if len(series) <= MAX_LEGEND:
+        ax.legend()
+    save(fig, path)
+
+
+def render_author(path, author, panels):
+    """Draws every test of one author; panels holds (title, xlabel, samples, percentages)."""
+    fig, axes = plt.subplots(
+        1, len(panels), figsize=(6 * len(panels), 5), squeeze=False
+    )
+    fig.subplots_adjust(left=0.05, right=0.98, bottom=0.22, wspace=0.25)
+    for ax, (title, xlabel, samples, percentages) in zip(axes.flat, panels):
+        plot_percentages(ax, samples, percentages, title=title)
+        ax.set_xlabel(xlabel)
+    fig.suptitle(author)
+    save(fig, path)
+
+
+def render_punctuation(path, author, text):
+    """
+    Draws the punctuation class maps of one author. The text is tokenized in the
+    pieces encode_authors used, so an NLTK report reads them from the token cache;
+    regex tokens have no punctuation, so the marks always come from NLTK tokens.
+    """
+    codes = np.concatenate(
+        [encode_punctuation(piece) for piece in split_text(text)]
+        or [np.zeros(0, dtype=np.uint8)]
+    )
+    save(plot_class_maps(codes, f"Punctuation maps for {author}"), path)
+
+
+RENDERERS = {
+    "comparison": render_comparison,
+    "author": render_author,
+    "punctuation": render_punctuation,
+}
+
+
+def render(task):
+    """Runs one (renderer, path, *args) task and returns the path written."""
+    kind, path, *args = task
+    RENDERERS[kind](path, *args)
+    return path
+
+
+def build_report(
+    strings_by_author,
+    output_dir=OUTPUT_DIR,
+    workers=None,
+    tokenizer="nltk",
+    tag=True,
+    punctuation=True,
+):
+    """Renders all figures for all authors in parallel and returns the files written."""
+    os.makedirs(output_dir, exist_ok=True)
+    corpus = encode_authors(strings_by_author, workers, tokenizer=tokenizer)
+    len_shortest_corpus = min(len(corpus[author]) for author in corpus)
+    profiles = build_profiles(corpus, len_shortest_corpus, tag, workers)
+    tests = {name: spec for name, spec in TESTS.items() if tag or name != "pos"}
+
+    percentages = {
+        author: {
+            name: frequency_percentages(getattr(profile, method)(), max_num)
+            for name, (method, max_num, _, _) in tests.items()
+        }
+        for author, profile in profiles.items()
+    }
+    tasks = []
+    for name, (_, _, title, xlabel) in tests.items():
+        series = [(author, *percentages[author][name]) for author in profiles]
+        path = os.path.join(output_dir, f"{name}.png")
+        tasks.append(("comparison", path, title, xlabel, series))
+    for author in profiles:
+        panels = [
+            (title, xlabel, *percentages[author][name])
+            for name, (_, _, title, xlabel) in tests.items()
+        ]
+        path = os.path.join(output_dir, f"{author}_tests.png")
+        tasks.append(("author", path, author, panels))
+        if punctuation:
+            path = os.path.join(output_dir, f"{author}_punctuation.png")
+            tasks.append(("punctuation", path, author, strings_by_author[author]))
+
+    with ProcessPoolExecutor(workers, initializer=use_agg) as pool:
+        return list(pool.map(render, tasks))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Writes the stylometry figures of every author to a directory."
+    )
+    parser.add_argument(
+        "corpus_dir",
+        nargs="?",
+        help="<author>.txt files or <author>/ directories (default: the sample books)",
+    )
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--tokenizer", choices=sorted(TOKENIZERS), default="nltk")
+    parser.add_argument("--no-pos", action="store_true", help="skip POS tagging")
+    parser.add_argument("--no-punctuation", action="store_true")
+    args = parser.parse_args()
+    use_agg()
+
+    if args.corpus_dir:
+        strings_by_author = load_corpus_dir(args.corpus_dir)
+    else:
+        strings_by_author = dict()
+        for author, filename in [
+            ("doyle", "hound.txt"),
+            ("wells", "war.txt"),
+            ("unknown", "lost.txt"),
+        ]:
+            with open(filename, encoding="utf-8") as infile:
+                strings_by_author[author] = infile.read()
+
+    paths = build_report(
+        strings_by_author,
+        args.out,
+        args.workers,
+        args.tokenizer,
+        tag=not args.no_pos,
+        punctuation=not args.no_punctuation,
+    )
+    print(f"Wrote {len(paths)} figures to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
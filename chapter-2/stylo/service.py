@@ -0,0 +1,306 @@
+"""
+Local attribution service with warm models.
+
+The compiled profile library, NLTK's tokenizer models and the tokenizer
+processes are loaded once at startup. Documents are POSTed to a small HTTP
+endpoint; each one is tokenized on the process pool, then requests that arrive
+within a few milliseconds of each other are scored together by one call to
+ProfileLibrary.score_batch. The `load` command is a matching load-test client.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import nltk
+import numpy as np
+
+from stylo.library import ProfileLibrary
+
+HOST = "127.0.0.1"
+PORT = 8765
+BATCH_SIZE = 32  # Documents scored together at most
+BATCH_WAIT = 0.002  # Seconds to wait for more documents after the first one
+MAX_BODY = 50 << 20  # Largest document accepted, in bytes
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Server Error"}
+
+
+def warm_up():
+    """Loads the tokenizer models in a worker process (pool initializer)."""
+    nltk.word_tokenize("Warm up the tokenizer.")
+
+
+def document_words(text):
+    """
+    Returns the lowercase alphabetic tokens of a document. Documents are not
+    written to the token cache, which would grow with every request.
+    """
+    return [token.lower() for token in nltk.word_tokenize(text) if token.isalpha()]
+
+
+class Batcher:
+    """Collects concurrent documents and scores them in batches."""
+
+    def __init__(self, library, batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT):
+        self.library = library
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.queue = asyncio.Queue()
+
+    async def score(self, words):
+        """Returns the score dictionary of one word list once its batch is scored."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((words, future))
+        return await future
+
+    async def next_batch(self):
+        """Waits for a document, then takes what arrives within batch_wait seconds."""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        """Scores batches until cancelled; runs as a background task."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.next_batch()
+            documents = [words for words, _ in batch]
+            try:
+                # Off the event loop, so new requests are read while a batch is scored.
+                results = await loop.run_in_executor(
+                    None, self.library.score_batch, documents
+                )
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), scores in zip(batch, results):
+                if not future.done():
+                    future.set_result(scores)
+
+
+class AttributionService:
+    """HTTP endpoint over a warm profile library."""
+
+    def __init__(
+        self, library, workers=None, batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT
+    ):
+        self.library = library
+        self.batcher = Batcher(library, batch_size, batch_wait)
+        workers = workers or os.cpu_count()
+        self.pool = ProcessPoolExecutor(workers, initializer=warm_up)
+        # Start every worker now, so the first requests do not pay for it.
+        list(self.pool.map(document_words, [""] * workers))
+
+    async def attribute(self, text):
+        """Returns the JSON-ready scores and rankings of one document."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        words = await loop.run_in_executor(self.pool, document_words, text)
+        scores = await self.batcher.score(words)
+        return {
+            "words": len(words),
+            "scores": {
+                test: dict(zip(self.library.authors, values.tolist()))
+                for test, values in scores.items()
+            },
+            "ranking": {test: self.library.ranking(scores, test) for test in scores},
+            "milliseconds": (time.perf_counter() - start) * 1000,
+        }
+
+    async def respond(self, method, path, body):
+        """Returns (status, payload) for one request."""
+        if method == "GET" and path == "/authors":
+            return 200, {"authors": self.library.authors}
+        if method != "POST" or path != "/score":
+            return 404, {"error": f"{method} {path} not found"}
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return 400, {"error": "document is not UTF-8"}
+        return 200, await self.attribute(text)
+
+    async def handle(self, reader, writer):
+        """Serves the requests of one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split()
+                except ValueError:
+                    await send(writer, 400, {"error": "malformed request line"})
+                    break
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await send(writer, 400, {"error": "invalid Content-Length"})
+                    break
+                if length > MAX_BODY:
+                    await send(writer, 400, {"error": "document too large"})
+                    break
+                body = await reader.readexactly(length)
+                try:
+                    status, payload = await self.respond(method, path, body)
+                except Exception as error:
+                    status, payload = 500, {"error": repr(error)}
+                await send(writer, status, payload)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        """Serves until cancelled."""
+        batcher = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Scoring against {len(self.library)} authors on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.pool.shutdown()
+
+
+async def send(writer, status, payload):
+    """Writes one JSON response."""
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+
+async def post(reader, writer, host, body):
+    """Sends one document over an open connection and returns (status, payload)."""
+    writer.write(
+        f"POST /score HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def load_test(documents, host=HOST, port=PORT, concurrency=8, requests=200):
+    """
+    Sends `requests` documents (cycling through the list) over `concurrency`
+    connections and returns the client-side latency of every request in ms.
+    """
+    bodies = [document.encode("utf-8") for document in documents]
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                start = time.perf_counter()
+                status, payload = await post(
+                    reader, writer, host, bodies[i % len(bodies)]
+                )
+                if status != 200:
+                    raise RuntimeError(f"request {i} failed: {payload}")
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serves warm attribution scores over HTTP, or load-tests the server."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="score POSTed documents")
+    serve.add_argument("profile_dir", help="directory of compiled profiles")
+    serve.add_argument("--host", default=HOST)
+    serve.add_argument("--port", type=int, default=PORT)
+    serve.add_argument("--workers", type=int, help="tokenizer processes")
+    serve.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    serve.add_argument(
+        "--batch-wait", type=float, default=BATCH_WAIT * 1000, help="milliseconds"
+    )
+    load = commands.add_parser("load", help="send documents to a running server")
+    load.add_argument("files", nargs="+", help="documents to send, in turn")
+    load.add_argument("--host", default=HOST)
+    load.add_argument("--port", type=int, default=PORT)
+    load.add_argument("--concurrency", type=int, default=8)
+    load.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        service = AttributionService(
+            ProfileLibrary(args.profile_dir),
+            args.workers,
+            args.batch_size,
+            args.batch_wait / 1000,
+        )
+        try:
+            asyncio.run(service.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    documents = []
+    for filename in args.files:
+        with open(filename, encoding="utf-8") as infile:
+            documents.append(infile.read())
+    start = time.perf_counter()
+    latencies = asyncio.run(
+        load_test(documents, args.host, args.port, args.concurrency, args.requests)
+    )
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(
+        f"{len(latencies)} requests in {elapsed:.2f} s "
+        f"({len(latencies) / elapsed:.1f}/s, concurrency {args.concurrency})"
+    )
+    print(
+        f"Latency ms: p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  max {latencies.max():.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
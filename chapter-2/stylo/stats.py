@@ -0,0 +1,22 @@
+"""
+The chi-square statistic shared by the attribution tests.
+
+Every test compares the counts of one text with the combined counts of that
+text and another, where the text is expected to hold a known proportion of
+each combined count.
+"""
+
+import numpy as np
+
+CHI_SQUARE_WORDS = 1000  # Most common words compared by the chi-square test
+
+
+def chi_square(observed, combined, proportion):
+    """
+    Returns the chi-square of observed counts against proportion * combined counts,
+    summed over the last axis. Features with no expected count are skipped.
+    """
+    expected = combined * proportion
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(expected > 0, (observed - expected) ** 2 / expected, 0)
+    return terms.sum(axis=-1)
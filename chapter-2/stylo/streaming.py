@@ -0,0 +1,130 @@
+"""
+Streaming tokenization and feature counting for corpora larger than memory.
+
+Files are read in chunks that are cut at paragraph (or at least whitespace)
+boundaries, so no token is split between chunks, and every chunk is fed to
+running counters. Peak memory depends on the chunk size, not on the corpus.
+"""
+
+import sys
+from collections import Counter
+from string import punctuation
+
+import nltk
+
+CHUNK_SIZE = 1 << 20  # Characters read from the file at a time
+
+
+def iter_chunks(filename, chunk_size=CHUNK_SIZE):
+    """Yields pieces of a text file that end on a paragraph or whitespace boundary."""
+    carry = ""
+    with open(filename, encoding="utf-8") as infile:
+        while True:
+            block = infile.read(chunk_size)
+            if not block:
+                break
+            text = carry + block
+            cut = text.rfind("\n\n")
+            if cut <= 0:
+                cut = max(text.rfind("\n"), text.rfind(" "))
+            if cut <= 0:
+                carry = text
+                continue
+            yield text[:cut]
+            carry = text[cut:]
+    if carry:
+        # Also a whitespace-only tail, so character features see the whole file.
+        yield carry
+
+
+def iter_tokens(filename, chunk_size=CHUNK_SIZE, tokenize=nltk.word_tokenize):
+    """Yields the tokens of a text file chunk by chunk."""
+    for chunk in iter_chunks(filename, chunk_size):
+        yield from tokenize(chunk)
+
+
+class FeatureAccumulator:
+    """
+    Running word-length, stopword, punctuation and vocabulary counts of one corpus,
+    optionally limited to its first `limit` words.
+    """
+
+    def __init__(self, stop_words, limit=None):
+        self.stop_words = stop_words
+        self.limit = limit
+        self.num_words = 0
+        self.num_tokens = 0
+        self.vocabulary = Counter()
+        self.punctuation = Counter()
+
+    def update(self, tokens):
+        """
+        Adds a batch of raw tokens to the counts. With a limit, every count stops
+        at the token that brings the number of words to the limit.
+        """
+        if self.limit is not None:
+            remaining = self.limit - self.num_words
+            end = 0
+            while end < len(tokens) and remaining > 0:
+                if tokens[end].isalpha():
+                    remaining -= 1
+                end += 1
+            tokens = tokens[:end]
+        self.num_tokens += len(tokens)
+        self.punctuation.update(token for token in tokens if token in punctuation)
+        words = [token.lower() for token in tokens if token.isalpha()]
+        self.num_words += len(words)
+        self.vocabulary.update(words)
+
+    @property
+    def word_lengths(self):
+        """Returns a Counter of word lengths."""
+        lengths = Counter()
+        for word, count in self.vocabulary.items():
+            lengths[len(word)] += count
+        return lengths
+
+    @property
+    def stopwords(self):
+        """Returns a Counter of the stopwords used."""
+        return Counter(
+            {
+                word: count
+                for word, count in self.vocabulary.items()
+                if word in self.stop_words
+            }
+        )
+
+
+def profile_file(
+    filename,
+    stop_words,
+    limit=None,
+    chunk_size=CHUNK_SIZE,
+    tokenize=nltk.word_tokenize,
+):
+    """Returns a FeatureAccumulator filled from a text file read in chunks."""
+    features = FeatureAccumulator(stop_words, limit)
+    for chunk in iter_chunks(filename, chunk_size):
+        features.update(tokenize(chunk))
+        if limit is not None and features.num_words >= limit:
+            break
+    return features
+
+
+def main():
+    from nltk.corpus import stopwords
+
+    stop_words = set(stopwords.words("english"))
+    for filename in sys.argv[1:]:
+        features = profile_file(filename, stop_words)
+        print(
+            f"\n{filename}: {features.num_words} words, {len(features.vocabulary)} unique"
+        )
+        print(f"Word lengths: {sorted(features.word_lengths.items())[:15]}")
+        print(f"Most common stopwords: {features.stopwords.most_common(10)}")
+        print(f"Punctuation: {features.punctuation.most_common(10)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Persistent token cache for the stylometry scripts.
+
+Token streams are stored under a key made of the text's content hash and the
+tokenizer version, as a vocabulary file plus a uint32 array of token ids that
+is loaded memory-mapped.
+"""
+import hashlib
+import os
+
+import nltk
+import numpy as np
+
+CACHE_DIR = ".token_cache"
+TOKENIZER_VERSION = f"nltk-{nltk.__version__}-word_tokenize"
+
+
+def cache_key(text, version=TOKENIZER_VERSION):
+    """Returns the cache key of a text for the given tokenizer version."""
+    digest = hashlib.sha256(version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def save_tokens(prefix, tokens):
+    """Writes tokens as <prefix>.vocab.txt and <prefix>.ids.npy."""
+    vocab = dict()
+    ids = np.fromiter(
+        (vocab.setdefault(token, len(vocab)) for token in tokens),
+        dtype=np.uint32,
+        count=len(tokens),
+    )
+    # Writes to temporary files first so an interrupted run never leaves half an entry.
+    with open(prefix + ".ids.tmp", "wb") as outfile:
+        np.save(outfile, ids)
+    with open(prefix + ".vocab.tmp", "w", encoding="utf-8") as outfile:
+        outfile.write("\n".join(vocab))
+    os.replace(prefix + ".ids.tmp", prefix + ".ids.npy")
+    os.replace(prefix + ".vocab.tmp", prefix + ".vocab.txt")
+    return list(vocab), ids
+
+
+def load_encoded(prefix):
+    """Returns the vocabulary list and the memory-mapped id array of a cache entry."""
+    with open(prefix + ".vocab.txt", encoding="utf-8") as infile:
+        vocab = infile.read().split("\n")
+    ids = np.load(prefix + ".ids.npy", mmap_mode="r")
+    return vocab, ids
+
+
+def tokenize_encoded(
+    text, tokenizer=nltk.word_tokenize, version=TOKENIZER_VERSION, cache_dir=CACHE_DIR
+):
+    """
+    Returns (vocab, ids) for a text, tokenizing it only if it is not cached yet.
+    """
+    prefix = os.path.join(cache_dir, cache_key(text, version))
+    if os.path.exists(prefix + ".vocab.txt") and os.path.exists(prefix + ".ids.npy"):
+        return load_encoded(prefix)
+    os.makedirs(cache_dir, exist_ok=True)
+    return save_tokens(prefix, tokenizer(text))
+
+
+def word_tokenize(
+    text, tokenizer=nltk.word_tokenize, version=TOKENIZER_VERSION, cache_dir=CACHE_DIR
+):
+    """Drop-in replacement for nltk.word_tokenize backed by the token cache."""
+    vocab, ids = tokenize_encoded(text, tokenizer, version, cache_dir)
+    return [vocab[i] for i in ids.tolist()]
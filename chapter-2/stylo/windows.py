@@ -0,0 +1,118 @@
+"""
+Sliding-window attribution of a disputed text.
+
+Every window of W words (moved by S words at a time) is scored against every
+known author with Burrows' Delta. Window counts are updated at the edges
+instead of being recounted, so the whole series costs time linear in the text.
+"""
+
+import argparse
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from stylo.delta import NUM_WORDS, DeltaScorer
+from stylo.parallel import words_from_text
+
+WINDOW = 5000
+STRIDE = 1000
+
+
+def _count(ids, num_features):
+    return np.bincount(ids[ids >= 0], minlength=num_features)
+
+
+def rolling_counts(ids, num_features, window=WINDOW, stride=STRIDE):
+    """
+    Yields (start, counts) for every window of an encoded text, where ids holds
+    feature indexes and -1 for other words. The last window always ends at the
+    end of the text. The yielded array is updated in place.
+    """
+    if len(ids) <= window:
+        yield 0, _count(ids, num_features)
+        return
+    last = len(ids) - window
+    starts = list(range(stride, last + 1, stride))
+    if not starts or starts[-1] != last:
+        starts.append(last)
+    counts = _count(ids[:window], num_features)
+    yield 0, counts
+    previous = 0
+    for start in starts:
+        if start - previous >= window:
+            counts = _count(ids[start : start + window], num_features)
+        else:
+            counts -= _count(ids[previous:start], num_features)
+            counts += _count(ids[previous + window : start + window], num_features)
+        previous = start
+        yield start, counts
+
+
+def delta_series(scorer, words, window=WINDOW, stride=STRIDE):
+    """
+    Returns the window start positions and a (windows x authors) array of Delta scores.
+    """
+    ids = scorer.encode(words)
+    size = min(window, len(words))
+    starts = []
+    deltas = []
+    for start, counts in rolling_counts(ids, len(scorer.words), window, stride):
+        starts.append(start)
+        deltas.append(scorer.score_frequencies(counts / max(size, 1)))
+    return np.array(starts), np.vstack(deltas)
+
+
+def plot_series(authors, starts, deltas, window, filename=None):
+    """Plots the Delta of every author along the text."""
+    fig, ax = plt.subplots(figsize=(10, 4))
+    for i, author in enumerate(authors):
+        ax.plot(starts + window // 2, deltas[:, i], label=author)
+    ax.set_title(f"Burrows' Delta in windows of {window} words (lower is closer)")
+    ax.set_xlabel("Position of the window centre [words]")
+    ax.set_ylabel("Delta")
+    ax.legend()
+    if filename:
+        fig.savefig(filename, dpi=100)
+    else:
+        plt.show(block=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Attributes every window of a disputed text to the known authors."
+    )
+    parser.add_argument("unknown", nargs="?", default="lost.txt")
+    parser.add_argument(
+        "--known",
+        nargs="+",
+        default=["doyle=hound.txt", "wells=war.txt"],
+        metavar="AUTHOR=FILE",
+    )
+    parser.add_argument("--window", type=int, default=WINDOW)
+    parser.add_argument("--stride", type=int, default=STRIDE)
+    parser.add_argument("--words", type=int, default=NUM_WORDS, help="features")
+    parser.add_argument(
+        "--plot", help="save the plot to this file instead of showing it"
+    )
+    args = parser.parse_args()
+
+    words_by_author = dict()
+    for item in args.known:
+        author, filename = item.split("=", 1)
+        with open(filename, encoding="utf-8") as infile:
+            words_by_author[author] = words_from_text(infile.read())
+    with open(args.unknown, encoding="utf-8") as infile:
+        words = words_from_text(infile.read())
+
+    scorer = DeltaScorer(words_by_author, args.words)
+    starts, deltas = delta_series(scorer, words, args.window, args.stride)
+    print(f"{'start':>8} {'end':>8}  most likely author")
+    for start, row in zip(starts, deltas):
+        best = int(np.argmin(row))
+        end = start + min(args.window, len(words))
+        print(f"{start:8d} {end:8d}  {scorer.authors[best]} ({row[best]:.3f})")
+    plot_series(scorer.authors, starts, deltas, args.window, args.plot)
+
+
+if __name__ == "__main__":
+    main()
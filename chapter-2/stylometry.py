@@ -1,8 +1,15 @@
 import matplotlib.pyplot as plt
-import nltk
-from nltk.corpus import stopwords
+import numpy as np
+
+from stylo.bootstrap import RESAMPLES, bootstrap, summarize
+from stylo.delta import NUM_WORDS, DeltaScorer
+from stylo.parallel import encode_authors
+from stylo.profile import build_profiles
+from stylo.stats import CHI_SQUARE_WORDS, chi_square
 
 LINES = ["-", ":", "--"]  # Line styles for graphs
+TOKENIZER = "nltk"  # "regex" tokenizes much faster, see stylo/fast_tokenize.py
+BOOTSTRAP = False  # True adds resampled intervals for chi-square and Jaccard (slow)
 
 
 def main():
@@ -15,11 +22,16 @@ def main():
 
     words_by_author = make_word_dict(strings_by_author)
     len_shortest_corpus = find_shortest_corpus(words_by_author)
-    word_length_test(words_by_author, len_shortest_corpus)
-    stopwords_test(words_by_author, len_shortest_corpus)
-    parts_of_speech_test(words_by_author, len_shortest_corpus)
-    vocab_test(words_by_author)
-    jaccard_test(words_by_author, len_shortest_corpus)
+    # Every corpus is counted once; the tests below only query the profiles.
+    profiles = build_profiles(words_by_author, len_shortest_corpus)
+    word_length_test(profiles)
+    stopwords_test(profiles)
+    parts_of_speech_test(profiles)
+    vocab_test(profiles)
+    jaccard_test(profiles)
+    if BOOTSTRAP:
+        bootstrap_test(words_by_author, len_shortest_corpus)
+    delta_test(profiles)
 
 
 def text_to_string(filename):
@@ -28,16 +40,12 @@ def text_to_string(filename):
         return infile.read()
 
 
-def make_word_dict(strings_by_author):
+def make_word_dict(strings_by_author, tokenizer=TOKENIZER):
     """
-    Returns a dictionary containing lists of tokens
-    in the form of words assigned to the corresponding author.
+    Returns a mapping of author -> uint32 array of word ids
+    over a vocabulary shared by all authors.
     """
-    words_by_author = dict()
-    for author in strings_by_author:
-        tokens = nltk.word_tokenize(strings_by_author[author])
-        words_by_author[author] = [token.lower() for token in tokens if token.isalpha()]
-    return words_by_author
+    return encode_authors(strings_by_author, tokenizer=tokenizer)
 
 
 def find_shortest_corpus(words_by_author):
@@ -48,25 +56,20 @@ def find_shortest_corpus(words_by_author):
         print(
             f'\nNumber of words for a key "{author}" = {len(words_by_author[author])}'
         )
-        len_shortest_corpus = min(word_count)
-        print(f"Length of shortest corpus = {len_shortest_corpus}\n")
-        return len_shortest_corpus
+    len_shortest_corpus = min(word_count)
+    print(f"Length of shortest corpus = {len_shortest_corpus}\n")
+    return len_shortest_corpus
 
 
-def word_length_test(words_by_author, len_shortest_corpus):
+def word_length_test(profiles):
     """
     Creates a graph showing the frequency of word length for an author
     with the data limited to the length of the shortest corpus
     """
-    by_author_lenght_freq_dist = dict()
     plt.figure(1)
     plt.ion()
-    for i, author in enumerate(words_by_author):
-        word_lenghts = [
-            len(word) for word in words_by_author[author][:len_shortest_corpus]
-        ]
-        by_author_lenght_freq_dist[author] = nltk.FreqDist(word_lenghts)
-        by_author_lenght_freq_dist[author].plot(
+    for i, author in enumerate(profiles):
+        profiles[author].word_lengths().plot(
             15,
             linestyle=LINES[i],
             label=author,
@@ -78,26 +81,14 @@ def word_length_test(words_by_author, len_shortest_corpus):
     plt.xlabel("Number of words")
 
 
-def stopwords_test(words_by_author, len_shortest_corpus):
+def stopwords_test(profiles):
     """
     Creates a graph of the frequency of occurrence of non-indexed words
     with data limited to the length of the shortest corpus.
     """
-    stopwords_by_author_freq_dist = dict()
     plt.figure(2)
-    # Uses a collection to speed up processing
-    stop_words = set(stopwords.words("english"))
-    # print(f"Number of non-indexed words {len(stop_words)}")
-    # print(f"Non-indexed words {stop_words}")
-
-    for i, author in enumerate(words_by_author):
-        stopwords_by_author = [
-            word
-            for word in words_by_author[author][:len_shortest_corpus]
-            if word in stop_words
-        ]
-        stopwords_by_author_freq_dist[author] = nltk.FreqDist(stopwords_by_author)
-        stopwords_by_author_freq_dist[author].plot(
+    for i, author in enumerate(profiles):
+        profiles[author].stopwords().plot(
             50,
             label=author,
             linestyle=LINES[i],
@@ -109,20 +100,16 @@ def stopwords_test(words_by_author, len_shortest_corpus):
     plt.xlabel("Word")
 
 
-def parts_of_speech_test(words_by_author, len_shortest_corpus):
+def parts_of_speech_test(profiles):
     """
-    Creates a chart of the part of speech used by the author
+    Creates a chart of the part of speech used by the author.
+    The profiles hold words without punctuation, so they are tagged in fixed
+    batches of pos_cache.BATCH_SIZE words that may cut sentences: the counts are
+    approximate at every batch boundary.
     """
-    by_author_pos_freq_dist = dict()
     plt.figure(3)
-
-    for i, author in enumerate(words_by_author):
-        pos_by_author = [
-            pos[1]
-            for pos in nltk.pos_tag(words_by_author[author][:len_shortest_corpus])
-        ]
-        by_author_pos_freq_dist[author] = nltk.FreqDist(pos_by_author)
-        by_author_pos_freq_dist[author].plot(
+    for i, author in enumerate(profiles):
+        profiles[author].parts_of_speech().plot(
             35,
             label=author,
             linestyle=LINES[i],
@@ -135,25 +122,34 @@ def parts_of_speech_test(words_by_author, len_shortest_corpus):
     plt.show(block=True)
 
 
-def vocab_test(words_by_author):
+def vocab_test(profiles):
     """
     Compares the vocabulary used by the authors using the chi-square test
     """
     chisquared_by_author = dict()
-    for author in words_by_author:
+    unknown_counts = profiles["unknown"].counts
+    for author in profiles:
         if author != "unknown":
-            combined_corpus = words_by_author[author] + words_by_author["unknown"]
-            author_proportion = len(words_by_author[author]) / len(combined_corpus)
-            combined_freq_dist = nltk.FreqDist(combined_corpus)
-            most_common_words = list(combined_freq_dist.most_common(1000))
-            chisquared = 0
-            for word, combined_count in most_common_words:
-                observed_count_author = words_by_author[author].count(word)
-                expected_count_author = combined_count * author_proportion
-                chisquared += (
-                    observed_count_author - expected_count_author
-                ) ** 2 / expected_count_author
-                chisquared_by_author[author] = chisquared
+            author_counts = profiles[author].counts
+            len_author = profiles[author].num_words
+            author_proportion = len_author / (
+                len_author + profiles["unknown"].num_words
+            )
+            combined = author_counts + unknown_counts
+            # Ties are ordered by first use in the author's text followed by the
+            # unknown text, as FreqDist.most_common orders them.
+            first_use = np.where(
+                author_counts > 0,
+                profiles[author].first_positions,
+                len_author + profiles["unknown"].first_positions,
+            )
+            most_common_words = np.lexsort((first_use, -combined))[:CHI_SQUARE_WORDS]
+            combined_counts = combined[most_common_words]
+            observed_counts_author = author_counts[most_common_words]
+            chisquared = float(
+                chi_square(observed_counts_author, combined_counts, author_proportion)
+            )
+            chisquared_by_author[author] = chisquared
             print(f"Chi-square for key {author} = {chisquared:.1f}")
     most_likely_author = min(chisquared_by_author, key=chisquared_by_author.get)
     print(
@@ -161,19 +157,21 @@ def vocab_test(words_by_author):
     )
 
 
-def jaccard_test(words_by_author, len_shortest_corpus):
+def jaccard_test(profiles):
     """
     Calculates Jaccard's similarity index between
     the disputed fragment and fragments of known authorship.
     """
     jaccard_by_author = dict()
-    unique_words_unknown = set(words_by_author["unknown"][:len_shortest_corpus])
-    authors = (author for author in words_by_author if author != "unknown")
+    unique_words_unknown = profiles["unknown"].presence
+    authors = (author for author in profiles if author != "unknown")
     for author in authors:
-        unique_words_author = set(words_by_author[author][:len_shortest_corpus])
-        shared_words = unique_words_author.intersection(unique_words_unknown)
-        jaccadr_sim = float(len(shared_words)) / (
-            len(unique_words_author) + len(unique_words_unknown) - len(shared_words)
+        unique_words_author = profiles[author].presence
+        shared_words = np.count_nonzero(unique_words_author & unique_words_unknown)
+        jaccadr_sim = float(shared_words) / (
+            np.count_nonzero(unique_words_author)
+            + np.count_nonzero(unique_words_unknown)
+            - shared_words
         )
         jaccard_by_author[author] = jaccadr_sim
         print(f"Jaccard index for the author {author.capitalize()} = {jaccadr_sim:.4f}")
@@ -184,5 +182,50 @@ def jaccard_test(words_by_author, len_shortest_corpus):
     )
 
 
+def bootstrap_test(words_by_author, len_shortest_corpus, resamples=RESAMPLES):
+    """
+    Repeats the chi-square and Jaccard tests on random samples of every corpus
+    with the length of the shortest corpus, and reports 95% intervals
+    and how often each author came out as the most likely one.
+    """
+    authors, scores = bootstrap(
+        words_by_author, len_shortest_corpus, resamples=resamples
+    )
+    for test, by_author in summarize(authors, scores).items():
+        print(
+            f"\nBootstrap {test} over {resamples} samples of {len_shortest_corpus} words:"
+        )
+        for author, (mean, low, high, win_rate) in by_author.items():
+            print(
+                f"    {author.capitalize():10} {mean:10.4f}  "
+                f"95% interval [{low:.4f}, {high:.4f}]  most likely in {win_rate:.1%}"
+            )
+
+
+def delta_test(profiles, num_words=NUM_WORDS):
+    """
+    Ranks the authors by Burrows' Delta over the most frequent words,
+    using z-scores computed across the corpora of known authorship.
+    """
+    known = [author for author in profiles if author != "unknown"]
+    counts = np.vstack([profiles[author].counts for author in known])
+    top_words = np.argsort(-counts.sum(axis=0), kind="stable")[:num_words]
+    frequencies = counts[:, top_words] / np.array(
+        [[profiles[author].num_words] for author in known]
+    )
+    scorer = DeltaScorer.from_frequencies(known, top_words, frequencies)
+    unknown = profiles["unknown"]
+    deltas = scorer.score_frequencies(
+        unknown.counts[top_words] / max(unknown.num_words, 1)
+    )
+    for author, delta in zip(scorer.authors, deltas):
+        print(f"Burrows' Delta for the author {author.capitalize()} = {delta:.4f}")
+
+    most_likely_author = scorer.authors[int(np.argmin(deltas))]
+    print(
+        f"Considering Burrows' Delta, the most likely author is: {most_likely_author.capitalize()}"
+    )
+
+
 if __name__ == "__main__":
     main()
@@ -1,7 +1,14 @@
+from collections import Counter
+
 import matplotlib.pyplot as plt
 import nltk
+import numpy as np
 from nltk.corpus import stopwords
 
+from stylo.report import frequency_percentages, plot_percentages
+from stylo.stats import CHI_SQUARE_WORDS, chi_square
+from stylo.token_cache import word_tokenize
+
 LINES = ["-", ":", "--"]  # Line styles for graphs
 
 
@@ -35,7 +42,7 @@ def make_word_dict(strings_by_author):
     """
     words_by_author = dict()
     for author in strings_by_author:
-        tokens = nltk.word_tokenize(strings_by_author[author])
+        tokens = word_tokenize(strings_by_author[author])
         words_by_author[author] = [token.lower() for token in tokens if token.isalpha()]
     return words_by_author
 
@@ -48,9 +55,9 @@ def find_shortest_corpus(words_by_author):
         print(
             f'\nNumber of words for a key "{author}" = {len(words_by_author[author])}'
         )
-        len_shortest_corpus = min(word_count)
-        print(f"Length of shortest corpus = {len_shortest_corpus}\n")
-        return len_shortest_corpus
+    len_shortest_corpus = min(word_count)
+    print(f"Length of shortest corpus = {len_shortest_corpus}\n")
+    return len_shortest_corpus
 
 
 def plot_fd_freq(
@@ -63,28 +70,17 @@ def plot_fd_freq(
     label=None,
 ):
     """Plotting frequencies instead of counts in FreqDist in NLTK"""
-    tmp = fd.copy()
-    norm = fd.N()
-    for key in tmp.keys():
-        tmp[key] = float(fd[key]) / norm * 100
-
-    if max_num:
-        tmp.plot(
-            max_num,
-            cumulative=cumulative,
-            title=title,
-            linewidth=linewidth,
-            linestyle=linestyle,
-            label=label,
-        )
-    else:
-        tmp.plot(
-            cumulative=cumulative,
-            title=title,
-            linewidth=linewidth,
-            linestyle=linestyle,
-            label=label,
-        )
+    # Percentages are computed as one array instead of a renormalized FreqDist copy.
+    samples, percentages = frequency_percentages(fd, max_num, cumulative)
+    plot_percentages(
+        plt.gca(),
+        samples,
+        percentages,
+        title=title,
+        linewidth=linewidth,
+        linestyle=linestyle,
+        label=label,
+    )
 
     return
 
@@ -174,25 +170,37 @@ def parts_of_speech_test(words_by_author, len_shortest_corpus):
     plt.show(block=True)
 
 
+def frequency_index(words_by_author):
+    """Returns a word counter for every author built in a single pass over each corpus."""
+    return {author: Counter(words) for author, words in words_by_author.items()}
+
+
 def vocab_test(words_by_author):
     """
     Compares the vocabulary used by the authors using the chi-square test
     """
     chisquared_by_author = dict()
-    for author in words_by_author:
+    # Counts every corpus once instead of scanning it again for each common word.
+    counts_by_author = frequency_index(words_by_author)
+    unknown_counts = counts_by_author["unknown"]
+    for author in counts_by_author:
         if author != "unknown":
-            combined_corpus = words_by_author[author] + words_by_author["unknown"]
-            author_proportion = len(words_by_author[author]) / len(combined_corpus)
-            combined_freq_dist = nltk.FreqDist(combined_corpus)
-            most_common_words = list(combined_freq_dist.most_common(1000))
-            chisquared = 0
-            for word, combined_count in most_common_words:
-                observed_count_author = words_by_author[author].count(word)
-                expected_count_author = combined_count * author_proportion
-                chisquared += (
-                    observed_count_author - expected_count_author
-                ) ** 2 / expected_count_author
-                chisquared_by_author[author] = chisquared
+            author_counts = counts_by_author[author]
+            len_author = len(words_by_author[author])
+            author_proportion = len_author / (
+                len_author + len(words_by_author["unknown"])
+            )
+            most_common_words = (author_counts + unknown_counts).most_common(
+                CHI_SQUARE_WORDS
+            )
+            combined_counts = np.array([count for _, count in most_common_words])
+            observed_counts_author = np.array(
+                [author_counts[word] for word, _ in most_common_words]
+            )
+            chisquared = float(
+                chi_square(observed_counts_author, combined_counts, author_proportion)
+            )
+            chisquared_by_author[author] = chisquared
             print(f"Chi-square for key {author} = {chisquared:.1f}")
     most_likely_author = min(chisquared_by_author, key=chisquared_by_author.get)
     print(